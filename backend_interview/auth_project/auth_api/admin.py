@@ -1,62 +1,204 @@
-from django.contrib import admin
-from django.db import transaction
+from collections import defaultdict
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import BooleanField, ExpressionWrapper, F, Q
+from django.db.models.functions import Now
 from django.utils import timezone
+from django.utils.functional import cached_property
 from .models import (
     CustomUser,
     CustomToken,
     FormSubmission,
     AchievementImage,
     RewardRedemption,
+    Reward,
+    DailyPointsRollup,
+    UserDailyPointsRollup,
+    ArchivedFormSubmission,
+    ArchivedRewardRedemption,
+    record_points_activity_bulk,
+    reject_reward_redemptions,
 )
 import logging
 
 logger = logging.getLogger(__name__)
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Changelist paginator that avoids an exact COUNT(*) on large unfiltered tables.
+    On PostgreSQL the planner's row estimate is used once the table is big enough
+    that the estimate's error no longer matters; filtered lists still count exactly.
+    """
+    estimate_threshold = 100000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where:
+            connection = connections[queryset.db]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                        [queryset.model._meta.db_table],
+                    )
+                    row = cursor.fetchone()
+                if row and row[0] >= self.estimate_threshold:
+                    return row[0]
+        return super().count
+
+
+# Base admin for the large auth_api tables: estimated page counts and no second
+# unfiltered COUNT(*) for the "N total" link.
+class ScalableModelAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
 # CustomUser admin registration with key details visible.
-class CustomUserAdmin(admin.ModelAdmin):
+class CustomUserAdmin(ScalableModelAdmin):
     list_display = ('email', 'is_staff', 'is_active', 'points', 'date_joined')
     search_fields = ('email',)
     ordering = ('email',)
     list_filter = ('is_staff', 'is_active')
+    date_hierarchy = 'date_joined'
 
 # CustomToken admin registration to monitor token lifecycle.
-class CustomTokenAdmin(admin.ModelAdmin):
+class CustomTokenAdmin(ScalableModelAdmin):
     list_display = ('user', 'token', 'created_at', 'expires_at', 'is_expired')
+    list_select_related = ('user',)
     search_fields = ('user__email', 'token')
     ordering = ('-created_at',)
+    date_hierarchy = 'created_at'
+
+    def get_queryset(self, request):
+        # Compute expiry in the changelist query instead of per row in Python.
+        return super().get_queryset(request).annotate(
+            expired=ExpressionWrapper(Q(expires_at__lt=Now()), output_field=BooleanField())
+        )
+
+    @admin.display(boolean=True, ordering='expired', description='Is expired')
+    def is_expired(self, obj):
+        return obj.expired
 
 # FormSubmission admin to track submission statuses and points.
-class FormSubmissionAdmin(admin.ModelAdmin):
-    list_display = ('user', 'form_title', 'submitted', 'points_earned')
+class FormSubmissionAdmin(ScalableModelAdmin):
+    list_display = ('user', 'form_title', 'submitted', 'points_earned', 'submitted_at')
+    list_select_related = ('user',)
     search_fields = ('user__email', 'form_title')
     list_filter = ('submitted',)
+    ordering = ('-id',)
+    date_hierarchy = 'submitted_at'
 
 # AchievementImage admin for monitoring uploaded achievement images.
-class AchievementImageAdmin(admin.ModelAdmin):
+class AchievementImageAdmin(ScalableModelAdmin):
     list_display = ('user', 'image_url', 'uploaded_at')
+    list_select_related = ('user',)
     search_fields = ('user__email',)
     ordering = ('-uploaded_at',)
+    date_hierarchy = 'uploaded_at'
 
 # Custom admin action for approving reward redemptions.
+@admin.action(description="Approve selected reward redemptions")
 def approve_reward_redemptions(modeladmin, request, queryset):
-    for redemption in queryset:
-        if not redemption.approved:
-            # Mark as approved; the model's save() will process point deductions.
-            redemption.approved = True
-            try:
-                with transaction.atomic():
-                    redemption.save()
-                    logger.info(
-                        f"Admin approved reward redemption for {redemption.user.email} - Reward: {redemption.reward_name}"
-                    )
-            except Exception as e:
-                logger.error(
-                    f"Error approving reward redemption for {redemption.user.email}: {str(e)}"
-                )
-approve_reward_redemptions.short_description = "Approve selected reward redemptions"
+    """
+    Approve the selected pending redemptions with set-based updates.
+    Each user's redemptions are approved oldest first for as long as their
+    points cover them; the rest stay pending. Rejected requests are ignored.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pending = list(
+            queryset.select_for_update()
+            .filter(approved=False, rejected_at__isnull=True)
+            .order_by('requested_at', 'id')
+            .values_list('id', 'user_id', 'reward_points')
+        )
+        balances = dict(
+            CustomUser.objects.select_for_update()
+            .filter(pk__in={user_id for _, user_id, _ in pending})
+            .values_list('id', 'points')
+        )
+
+        approved_ids = []
+        deductions = defaultdict(int)
+        skipped_ids = []
+        for redemption_id, user_id, reward_points in pending:
+            if reward_points > 0 and balances[user_id] - deductions[user_id] >= reward_points:
+                approved_ids.append(redemption_id)
+                deductions[user_id] += reward_points
+            else:
+                skipped_ids.append(redemption_id)
+
+        RewardRedemption.objects.filter(pk__in=approved_ids).update(
+            approved=True, points_deducted=True, approved_at=now
+        )
+        users_by_deduction = defaultdict(list)
+        for user_id, amount in deductions.items():
+            users_by_deduction[amount].append(user_id)
+        for amount, user_ids in users_by_deduction.items():
+            CustomUser.objects.filter(pk__in=user_ids).update(points=F('points') - amount)
+        record_points_activity_bulk(
+            {user_id: {'redeemed': amount} for user_id, amount in deductions.items()}, when=now
+        )
+
+    logger.info(
+        f"Admin {request.user.email} approved {len(approved_ids)} reward redemptions; {len(skipped_ids)} left pending."
+    )
+    modeladmin.message_user(request, f"Approved {len(approved_ids)} reward redemptions.", messages.SUCCESS)
+    if skipped_ids:
+        modeladmin.message_user(
+            request,
+            f"{len(skipped_ids)} redemptions were left pending due to insufficient points or invalid reward points.",
+            messages.WARNING,
+        )
+
+
+@admin.action(description="Reject selected reward redemptions")
+def reject_selected_reward_redemptions(modeladmin, request, queryset):
+    """Reject the selected pending redemptions, returning their reserved stock."""
+    rejected = reject_reward_redemptions(queryset)
+    logger.info(f"Admin {request.user.email} rejected {rejected} reward redemptions.")
+    modeladmin.message_user(request, f"Rejected {rejected} reward redemptions.", messages.SUCCESS)
+
+class RestockActionForm(ActionForm):
+    restock_count = forms.IntegerField(min_value=1, required=False, label='Units')
+
+
+@admin.action(description="Restock selected limited rewards")
+def restock_rewards(modeladmin, request, queryset):
+    """Add the entered number of units to each selected reward's limited stock."""
+    count = request.POST.get('restock_count')
+    if not count or not count.isdigit() or int(count) < 1:
+        modeladmin.message_user(request, "Enter a positive number of units to restock.", messages.ERROR)
+        return
+    restocked = sum(Reward.restock(pk, int(count)) for pk in queryset.values_list('pk', flat=True))
+    logger.info(f"Admin {request.user.email} restocked {restocked} rewards by {count} units.")
+    modeladmin.message_user(request, f"Added {count} units to {restocked} limited rewards.", messages.SUCCESS)
+
+# Reward catalog admin; saving a reward refreshes the cached catalog snapshot.
+# Live stock is only changed through the restock action, so a form loaded before
+# a reservation cannot write the old count back.
+class RewardAdmin(ScalableModelAdmin):
+    list_display = ('name', 'points_cost', 'stock', 'is_active', 'updated_at')
+    list_editable = ('is_active',)
+    list_filter = ('is_active',)
+    search_fields = ('name',)
+    ordering = ('points_cost', 'id')
+    action_form = RestockActionForm
+    actions = [restock_rewards]
+
+    def get_readonly_fields(self, request, obj=None):
+        return ('stock',) if obj is not None else ()
 
 # RewardRedemption admin with all details and the custom action.
-class RewardRedemptionAdmin(admin.ModelAdmin):
+class RewardRedemptionAdmin(ScalableModelAdmin):
     list_display = (
         'user', 
         'reward_name', 
@@ -64,12 +206,60 @@ class RewardRedemptionAdmin(admin.ModelAdmin):
         'approved', 
         'requested_at', 
         'approved_at', 
-        'points_deducted'
+        'points_deducted',
+        'rejected_at',
     )
+    list_select_related = ('user',)
     search_fields = ('user__email', 'reward_name')
-    list_filter = ('approved', 'points_deducted', 'requested_at')
+    list_filter = ('approved', 'points_deducted', ('rejected_at', admin.EmptyFieldListFilter))
     ordering = ('-requested_at',)
-    actions = [approve_reward_redemptions]
+    date_hierarchy = 'requested_at'
+    actions = [approve_reward_redemptions, reject_selected_reward_redemptions]
+
+    # Deleting a pending request rejects it first, so its reserved stock is released.
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            reject_reward_redemptions(RewardRedemption.objects.filter(pk=obj.pk))
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            reject_reward_redemptions(queryset)
+            super().delete_queryset(request, queryset)
+
+# Daily points rollups; maintained automatically, so they are read-only here.
+class DailyPointsRollupAdmin(ScalableModelAdmin):
+    list_display = ('day', 'earned', 'redeemed', 'forms_completed', 'achievements_uploaded')
+    date_hierarchy = 'day'
+    ordering = ('-day',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+class UserDailyPointsRollupAdmin(DailyPointsRollupAdmin):
+    list_display = ('user', 'day', 'earned', 'redeemed', 'forms_completed', 'achievements_uploaded')
+    list_select_related = ('user',)
+    search_fields = ('user__email',)
+
+# Archived records are immutable history moved out by archive_settled_records.
+class ArchivedFormSubmissionAdmin(ScalableModelAdmin):
+    list_display = ('user', 'form_title', 'points_earned', 'submitted_at', 'archived_at')
+    list_select_related = ('user',)
+    search_fields = ('user__email', 'form_title')
+    ordering = ('-id',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+class ArchivedRewardRedemptionAdmin(ArchivedFormSubmissionAdmin):
+    list_display = ('user', 'reward_name', 'reward_points', 'requested_at', 'approved_at', 'archived_at')
+    search_fields = ('user__email', 'reward_name')
 
 # Register all models with their respective ModelAdmin classes.
 admin.site.register(CustomUser, CustomUserAdmin)
@@ -77,3 +267,8 @@ admin.site.register(CustomToken, CustomTokenAdmin)
 admin.site.register(FormSubmission, FormSubmissionAdmin)
 admin.site.register(AchievementImage, AchievementImageAdmin)
 admin.site.register(RewardRedemption, RewardRedemptionAdmin)
+admin.site.register(Reward, RewardAdmin)
+admin.site.register(DailyPointsRollup, DailyPointsRollupAdmin)
+admin.site.register(UserDailyPointsRollup, UserDailyPointsRollupAdmin)
+admin.site.register(ArchivedFormSubmission, ArchivedFormSubmissionAdmin)
+admin.site.register(ArchivedRewardRedemption, ArchivedRewardRedemptionAdmin)
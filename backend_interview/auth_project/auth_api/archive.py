@@ -0,0 +1,198 @@
+"""
+Hot/cold archival of settled rows.
+
+Approved redemptions and submitted forms older than the archive horizon are
+copied into their archive tables and deleted from the hot tables in small,
+id-ordered batches, each in its own short transaction, so the admin approval
+queue and the per-user read endpoints only ever scan recent rows. Expired
+tokens and idempotency keys carry no history worth keeping and are purged instead,
+and redemption requests left pending too long are rejected to release their stock.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (
+    ArchivedFormSubmission,
+    ArchivedRewardRedemption,
+    CustomToken,
+    FormSubmission,
+    IdempotencyKey,
+    RewardRedemption,
+    reject_reward_redemptions,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 180
+DEFAULT_ARCHIVE_BATCH_SIZE = 500
+DEFAULT_REDEMPTION_PENDING_DAYS = 30
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = getattr(settings, 'ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS)
+    return timezone.now() - timedelta(days=days)
+
+
+# Migration that added FormSubmission.submitted_at; rows submitted before it have none.
+SUBMITTED_AT_MIGRATION = ('auth_api', '0002_formsubmission_submitted_at')
+
+
+def submitted_at_added_at():
+    """When the submitted_at column was added, or None if that migration is not recorded."""
+    app, name = SUBMITTED_AT_MIGRATION
+    return (
+        MigrationRecorder(connection).migration_qs
+        .filter(app=app, name=name)
+        .values_list('applied', flat=True)
+        .first()
+    )
+
+
+def _settled_submissions(cutoff):
+    settled = Q(submitted=True, submitted_at__lt=cutoff)
+    # Submissions without a timestamp predate the submitted_at column, so they are
+    # past the horizon once the column itself is.
+    added_at = submitted_at_added_at()
+    if added_at is not None and added_at < cutoff:
+        settled |= Q(submitted=True, submitted_at__isnull=True)
+    return settled
+
+
+# kind -> (hot model, settled filter builder, archive model, fields copied across)
+ARCHIVABLE = {
+    'redemptions': (
+        RewardRedemption,
+        lambda cutoff: Q(approved=True, points_deducted=True, approved_at__lt=cutoff),
+        ArchivedRewardRedemption,
+        ('user_id', 'reward_name', 'reward_points', 'requested_at', 'approved_at'),
+    ),
+    'submissions': (
+        FormSubmission,
+        _settled_submissions,
+        ArchivedFormSubmission,
+        ('user_id', 'form_title', 'points_earned', 'submitted_at'),
+    ),
+}
+
+
+def _archive_batch(model, settled, archive_model, fields, batch_size):
+    with transaction.atomic():
+        rows = list(
+            model.objects.select_for_update()
+            .filter(settled)
+            .order_by('id')
+            .values('id', *fields)[:batch_size]
+        )
+        if not rows:
+            return 0
+        ids = [row['id'] for row in rows]
+        # original_id is unique, so a batch replayed after a crash is not duplicated.
+        archive_model.objects.bulk_create(
+            [archive_model(original_id=row.pop('id'), **row) for row in rows],
+            ignore_conflicts=True,
+        )
+        model.objects.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+def archive_settled(kind, days=None, batch_size=DEFAULT_ARCHIVE_BATCH_SIZE, max_batches=None):
+    """
+    Move settled rows of one kind ('redemptions' or 'submissions') older than
+    the horizon into the archive, batch by batch. Returns the number moved.
+    """
+    model, settled_filter, archive_model, fields = ARCHIVABLE[kind]
+    settled = settled_filter(archive_cutoff(days))
+    moved = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        count = _archive_batch(model, settled, archive_model, fields, batch_size)
+        if not count:
+            break
+        moved += count
+        batches += 1
+    logger.info(f"Archived {moved} settled {kind} in {batches} batches.")
+    return moved
+
+
+def purge_expired_tokens(days=None, batch_size=DEFAULT_ARCHIVE_BATCH_SIZE, max_batches=None):
+    """Delete tokens that expired before the archive horizon, batch by batch."""
+    cutoff = archive_cutoff(days)
+    purged = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = list(
+            CustomToken.objects.filter(expires_at__lt=cutoff)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        purged += CustomToken.objects.filter(pk__in=ids).delete()[0]
+        batches += 1
+    logger.info(f"Purged {purged} expired tokens in {batches} batches.")
+    return purged
+
+
+def purge_expired_idempotency_keys(batch_size=DEFAULT_ARCHIVE_BATCH_SIZE, max_batches=None):
+    """Delete idempotency keys past their TTL, batch by batch."""
+    now = timezone.now()
+    purged = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = list(
+            IdempotencyKey.objects.filter(expires_at__lte=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        purged += IdempotencyKey.objects.filter(pk__in=ids).delete()[0]
+        batches += 1
+    logger.info(f"Purged {purged} expired idempotency keys in {batches} batches.")
+    return purged
+
+
+def stale_redemption_cutoff():
+    days = getattr(settings, 'REDEMPTION_PENDING_DAYS', DEFAULT_REDEMPTION_PENDING_DAYS)
+    return timezone.now() - timedelta(days=days)
+
+
+def reject_stale_redemptions(batch_size=DEFAULT_ARCHIVE_BATCH_SIZE, max_batches=None):
+    """Reject redemptions pending longer than REDEMPTION_PENDING_DAYS, releasing their stock."""
+    cutoff = stale_redemption_cutoff()
+    rejected = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = list(
+            RewardRedemption.objects.filter(approved=False, rejected_at__isnull=True, requested_at__lt=cutoff)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        rejected += reject_reward_redemptions(RewardRedemption.objects.filter(pk__in=ids))
+        batches += 1
+    logger.info(f"Rejected {rejected} stale pending redemptions in {batches} batches.")
+    return rejected
+
+
+def settled_counts(days=None):
+    """Count the rows an archive run would move or purge, without touching them."""
+    cutoff = archive_cutoff(days)
+    counts = {
+        kind: model.objects.filter(settled_filter(cutoff)).count()
+        for kind, (model, settled_filter, _, _) in ARCHIVABLE.items()
+    }
+    counts['tokens'] = CustomToken.objects.filter(expires_at__lt=cutoff).count()
+    counts['idempotency_keys'] = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).count()
+    counts['stale_redemptions'] = RewardRedemption.objects.filter(
+        approved=False, rejected_at__isnull=True, requested_at__lt=stale_redemption_cutoff()
+    ).count()
+    return counts
@@ -0,0 +1,43 @@
+"""
+Token authentication that loads only the user columns a view needs.
+
+DRF's TokenAuthentication reads the whole user row with every token lookup.
+Views using ProjectedTokenAuthentication can define get_user_columns(request);
+the token is then fetched by primary key together with just those user
+columns. Any other user field still loads on first access.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+# Always loaded: authentication checks is_active, and request.user needs its pk.
+REQUIRED_USER_COLUMNS = ('id', 'is_active')
+
+
+class ProjectedTokenAuthentication(TokenAuthentication):
+    user_columns = None
+
+    def authenticate(self, request):
+        view = (request.parser_context or {}).get('view')
+        get_user_columns = getattr(view, 'get_user_columns', None)
+        if get_user_columns is not None:
+            self.user_columns = get_user_columns(request)
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        if self.user_columns is None:
+            return super().authenticate_credentials(key)
+
+        model = self.get_model()
+        columns = dict.fromkeys([*REQUIRED_USER_COLUMNS, *self.user_columns])
+        try:
+            token = model.objects.select_related('user').only(
+                'key', 'user', *(f'user__{column}' for column in columns)
+            ).get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
@@ -0,0 +1,102 @@
+"""
+Versioned in-memory snapshot of the reward catalog.
+
+Each process keeps the active rewards in memory alongside the catalog version
+it was built from. The version is derived from the database (the latest
+Reward.updated_at and the number of rewards), so every process sees an edit
+however its cache is configured; each process re-reads it at most every
+REWARD_CATALOG_VERSION_TTL_SECONDS. The snapshot is rebuilt (from the cache,
+or the database as a last resort) when the version moves.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+
+from .models import Reward
+
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+DEFAULT_VERSION_TTL_SECONDS = 5
+
+_lock = threading.Lock()
+_snapshot = None
+# (version, monotonic time it was read)
+_version = None
+
+
+class CatalogSnapshot:
+    def __init__(self, version, rewards):
+        self.version = version
+        self.rewards = rewards
+        self.by_id = {reward['id']: reward for reward in rewards}
+        self.by_name = {reward['name']: reward for reward in rewards}
+
+    def as_payload(self):
+        return {
+            'version': self.version,
+            'rewards': [
+                {
+                    'id': reward['id'],
+                    'name': reward['name'],
+                    'description': reward['description'],
+                    'points': reward['points_cost'],
+                    'limited': reward['stock'] is not None,
+                    'in_stock': reward['stock'] is None or reward['stock'] > 0,
+                }
+                for reward in self.rewards
+            ],
+        }
+
+
+def _load_rewards():
+    return list(
+        Reward.objects.filter(is_active=True)
+        .order_by('points_cost', 'id')
+        .values('id', 'name', 'description', 'points_cost', 'stock')
+    )
+
+
+def catalog_version():
+    """Return the catalog version, reading it from the database at most once per TTL."""
+    global _version
+    ttl = getattr(settings, 'REWARD_CATALOG_VERSION_TTL_SECONDS', DEFAULT_VERSION_TTL_SECONDS)
+    current = _version
+    now = time.monotonic()
+    if current is not None and now - current[1] < ttl:
+        return current[0]
+    state = Reward.objects.aggregate(changed=Max('updated_at'), count=Count('id'))
+    changed = int(state['changed'].timestamp() * 1_000_000) if state['changed'] else 0
+    version = f"{changed}-{state['count']}"
+    _version = (version, now)
+    return version
+
+
+def expire_catalog_version():
+    """Make this process re-read the catalog version on its next lookup."""
+    global _version
+    _version = None
+
+
+def get_reward_catalog():
+    """Return the current CatalogSnapshot, rebuilding it only when the version moved."""
+    global _snapshot
+    cache = caches['default']
+    version = catalog_version()
+
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _lock:
+        # Another thread may have rebuilt the snapshot while we waited.
+        if _snapshot is not None and _snapshot.version == version:
+            return _snapshot
+        rewards_key = f'reward_catalog:{version}'
+        rewards = cache.get(rewards_key)
+        if rewards is None:
+            rewards = _load_rewards()
+            cache.set(rewards_key, rewards, timeout=SNAPSHOT_TIMEOUT)
+        _snapshot = CatalogSnapshot(version, rewards)
+        return _snapshot
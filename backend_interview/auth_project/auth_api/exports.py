@@ -0,0 +1,196 @@
+"""
+Streaming exports of points, form submissions and reward redemptions.
+
+Rows are read with values() projections over server-side iterators and
+encoded into NDJSON or CSV chunks as they are produced, optionally gzipped on
+the fly, so memory use does not grow with the number of exported rows.
+"""
+import csv
+import io
+import zlib
+from datetime import datetime, time
+from itertools import chain
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import (
+    ArchivedFormSubmission,
+    ArchivedRewardRedemption,
+    CustomUser,
+    FormSubmission,
+    RewardRedemption,
+)
+
+DEFAULT_CHUNK_SIZE = 2000
+# Encoded rows are buffered up to this many bytes before being yielded.
+FLUSH_BYTES = 64 * 1024
+
+# dataset name -> (model, projected fields, date field used for range filters)
+DATASETS = {
+    'points': (
+        CustomUser,
+        ('id', 'email', 'points', 'date_joined'),
+        'date_joined',
+    ),
+    'submissions': (
+        FormSubmission,
+        ('id', 'user_id', 'user__email', 'form_title', 'points_earned', 'submitted', 'submitted_at'),
+        'submitted_at',
+    ),
+    'redemptions': (
+        RewardRedemption,
+        ('id', 'user_id', 'user__email', 'reward_name', 'reward_points', 'approved',
+         'points_deducted', 'requested_at', 'approved_at', 'rejected_at'),
+        'requested_at',
+    ),
+}
+
+# dataset name -> (archive model, values of the hot fields the archive leaves out).
+# Archived rows keep their hot-table id as original_id and are always settled.
+ARCHIVED_DATASETS = {
+    'submissions': (ArchivedFormSubmission, {'submitted': True}),
+    'redemptions': (ArchivedRewardRedemption, {'approved': True, 'points_deducted': True, 'rejected_at': None}),
+}
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def parse_bound(value, end=False):
+    """
+    Parse an ISO date or datetime query bound into an aware datetime.
+    A bare date is expanded to the start (or, for end bounds, the end) of that day.
+    Raises ValueError for values that are neither.
+    """
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value}")
+        parsed = datetime.combine(day, time.max if end else time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _filtered(queryset, date_field, id_field, start=None, end=None, since_id=None):
+    if start is not None:
+        queryset = queryset.filter(**{f'{date_field}__gte': start})
+    if end is not None:
+        queryset = queryset.filter(**{f'{date_field}__lte': end})
+    if since_id is not None:
+        queryset = queryset.filter(**{f'{id_field}__gt': since_id})
+    return queryset.order_by(id_field)
+
+
+def export_queryset(dataset, **filters):
+    """Build the projected, id-ordered queryset for one export dataset."""
+    model, fields, date_field = DATASETS[dataset]
+    return _filtered(model.objects.all(), date_field, 'id', **filters).values(*fields)
+
+
+def export_fields(dataset, include_archived=False):
+    """Column names of an export; exports including the archive flag each row with 'archived'."""
+    fields = DATASETS[dataset][1]
+    if include_archived and dataset in ARCHIVED_DATASETS:
+        return (*fields, 'archived')
+    return fields
+
+
+def archived_rows(dataset, **filters):
+    """
+    Yield the dataset's archived rows shaped like export rows, ordered by original id.
+    Filters match export_queryset(); since_id applies to the original ids.
+    """
+    _, fields, date_field = DATASETS[dataset]
+    archive_model, settled = ARCHIVED_DATASETS[dataset]
+    columns = ['original_id' if field == 'id' else field for field in fields if field not in settled]
+    queryset = _filtered(archive_model.objects.all(), date_field, 'original_id', **filters).values(*columns)
+    for row in queryset.iterator():
+        row['id'] = row.pop('original_id')
+        yield {**{field: settled[field] if field in settled else row[field] for field in fields}, 'archived': True}
+
+
+def export_rows(dataset, chunk_size=DEFAULT_CHUNK_SIZE, include_archived=False, **filters):
+    """Iterate the export's rows: the hot table, then its archive when include_archived is set."""
+    rows = export_queryset(dataset, **filters).iterator(chunk_size=chunk_size)
+    if include_archived and dataset in ARCHIVED_DATASETS:
+        return chain((dict(row, archived=False) for row in rows), archived_rows(dataset, **filters))
+    return rows
+
+
+class ExportJSONEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder that writes datetimes with isoformat() like the CSV export,
+    keeping microseconds so exported timestamps work as exact incremental bounds.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _iter_ndjson(rows):
+    encoder = ExportJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+def _iter_csv(rows, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(fields)
+    yield drain()
+    for row in rows:
+        writer.writerow([
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in (row[field] for field in fields)
+        ])
+        yield drain()
+
+
+def iter_export(dataset, fmt, compress=False, chunk_size=DEFAULT_CHUNK_SIZE, include_archived=False, **filters):
+    """
+    Yield the encoded export as bytes chunks of roughly FLUSH_BYTES each.
+    Filters are passed through to export_queryset(); include_archived appends the
+    archived rows of the submissions and redemptions datasets. When compress is
+    set the stream is a single gzip member.
+    """
+    rows = export_rows(dataset, chunk_size=chunk_size, include_archived=include_archived, **filters)
+    if fmt == 'csv':
+        lines = _iter_csv(rows, export_fields(dataset, include_archived))
+    else:
+        lines = _iter_ndjson(rows)
+
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    pending = []
+    pending_size = 0
+    for line in lines:
+        data = line.encode('utf-8')
+        if compressor is not None:
+            data = compressor.compress(data)
+        if data:
+            pending.append(data)
+            pending_size += len(data)
+        if pending_size >= FLUSH_BYTES:
+            yield b''.join(pending)
+            pending = []
+            pending_size = 0
+    if compressor is not None:
+        pending.append(compressor.flush())
+    if pending:
+        yield b''.join(pending)
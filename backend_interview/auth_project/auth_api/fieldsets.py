@@ -0,0 +1,57 @@
+"""
+Sparse fieldsets for read endpoints.
+
+Clients pass `?fields=a,b` to receive only those keys. Each endpoint describes
+its response as a FieldSet of Fields: every field names the model columns it
+reads and how to build its value from a values() row. Only the columns behind
+the requested fields are selected, so a join is made only when a requested
+field crosses a relation.
+"""
+FIELDS_PARAM = 'fields'
+
+
+class Field:
+    def __init__(self, *columns, build=None):
+        self.columns = columns
+        # By default the value is the field's only column, as read.
+        self.build = build or (lambda row: row[columns[0]])
+
+
+class FieldSet:
+    def __init__(self, **fields):
+        self.fields = fields
+
+    def requested(self, request):
+        """
+        Return the field names asked for with ?fields=, in declaration order.
+        No parameter means every field. Raises ValueError naming unknown fields.
+        """
+        raw = request.query_params.get(FIELDS_PARAM)
+        if raw is None:
+            return tuple(self.fields)
+        names = {name.strip() for name in raw.split(',') if name.strip()}
+        if not names:
+            raise ValueError(f"No fields requested. Available: {', '.join(self.fields)}.")
+        unknown = names - set(self.fields)
+        if unknown:
+            raise ValueError(
+                f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(self.fields)}."
+            )
+        return tuple(name for name in self.fields if name in names)
+
+    def columns(self, names):
+        """Model columns needed for `names`, deduplicated, for only() or values()."""
+        columns = []
+        for name in names:
+            for column in self.fields[name].columns:
+                if column not in columns:
+                    columns.append(column)
+        return columns
+
+    def render(self, row, names):
+        """Build the response dict for `names` from a values() row."""
+        return {name: self.fields[name].build(row) for name in names}
+
+    def render_instance(self, instance, names):
+        """Like render(), for a model instance loaded with only() these columns."""
+        return self.render({column: getattr(instance, column) for column in self.columns(names)}, names)
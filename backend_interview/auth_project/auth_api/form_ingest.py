@@ -0,0 +1,220 @@
+"""
+Batched ingest of Google Forms response exports.
+
+Rows are streamed from CSV or NDJSON input and processed in fixed-size batches,
+so memory stays flat no matter how large the export is. Each batch resolves
+respondents to users with a single email lookup, upserts FormSubmission rows
+in bulk and credits points with one aggregated UPDATE per distinct increment.
+"""
+import csv
+import json
+import logging
+from collections import defaultdict
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .models import ArchivedFormSubmission, CustomUser, FormSubmission, record_points_activity_bulk
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+# A batch binds up to two IN lists of this length in one query; this keeps them
+# well inside SQLite's 32766 bound parameters (and PostgreSQL's 65535).
+MAX_BATCH_SIZE = 5000
+DEFAULT_FORM_POINTS = 20
+
+# Column/key names Google Forms and our own exports use for the respondent email.
+EMAIL_KEYS = ('email address', 'email', 'respondent_email', 'username')
+FORM_TITLE_KEYS = ('form_title', 'form title', 'form')
+
+
+def _pick(row, keys):
+    for key, value in row.items():
+        if key and key.strip().lower() in keys and value:
+            return str(value).strip()
+    return None
+
+
+def iter_csv_rows(lines):
+    """Yield each CSV response row as a dict keyed by the header row."""
+    for row in csv.DictReader(lines):
+        yield row
+
+
+def iter_ndjson_rows(lines):
+    """Yield each non-blank NDJSON line as a dict, skipping malformed lines."""
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            logger.warning(f"Skipping malformed NDJSON line {line_number} in form ingest.")
+            continue
+        if isinstance(row, dict):
+            yield row
+
+
+def iter_rows(lines, fmt):
+    if fmt == 'csv':
+        return iter_csv_rows(lines)
+    if fmt == 'ndjson':
+        return iter_ndjson_rows(lines)
+    raise ValueError(f"Unsupported form export format: {fmt}")
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _new_stats():
+    return {
+        'rows': 0,
+        'matched': 0,
+        'unmatched': 0,
+        'created': 0,
+        'updated': 0,
+        'already_submitted': 0,
+        'users_credited': 0,
+        'points_credited': 0,
+    }
+
+
+def _ingest_batch(rows, form_title, points, stats):
+    # Map each row to a (lowercased email, form title) pair; the form title may
+    # come from the row itself when one export covers several forms. Exports keep
+    # whatever case respondents typed, so emails are matched case-insensitively.
+    pairs = set()
+    for row in rows:
+        stats['rows'] += 1
+        email = _pick(row, EMAIL_KEYS)
+        title = _pick(row, FORM_TITLE_KEYS) or form_title
+        if not email or not title:
+            stats['unmatched'] += 1
+            continue
+        pairs.add((email.lower(), title))
+
+    if not pairs:
+        return
+
+    emails = {email for email, _ in pairs}
+    user_ids = {}
+    # Lowest id wins if several accounts differ only by case.
+    for email, user_id in (
+        CustomUser.objects.annotate(email_lower=Lower('email'))
+        .filter(email_lower__in=emails)
+        .order_by('-id')
+        .values_list('email_lower', 'id')
+    ):
+        user_ids[email] = user_id
+
+    wanted = set()
+    for email, title in pairs:
+        user_id = user_ids.get(email)
+        if user_id is None:
+            stats['unmatched'] += 1
+            continue
+        wanted.add((user_id, title))
+    stats['matched'] += len(wanted)
+    if not wanted:
+        return
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {}
+        rows_qs = (
+            FormSubmission.objects
+            .select_for_update()
+            .filter(
+                user_id__in={user_id for user_id, _ in wanted},
+                form_title__in={title for _, title in wanted},
+            )
+            .values_list('id', 'user_id', 'form_title', 'submitted')
+        )
+        for pk, user_id, title, submitted in rows_qs:
+            key = (user_id, title)
+            # Any submitted row for the pair wins over stale unsubmitted ones.
+            if key in wanted and (key not in existing or submitted):
+                existing[key] = (pk, submitted)
+        # Archived submissions were settled long ago and must not be credited again.
+        archived_qs = ArchivedFormSubmission.objects.filter(
+            user_id__in={user_id for user_id, _ in wanted},
+            form_title__in={title for _, title in wanted},
+        ).values_list('original_id', 'user_id', 'form_title')
+        for pk, user_id, title in archived_qs:
+            if (user_id, title) in wanted:
+                existing[(user_id, title)] = (pk, True)
+
+        to_create = []
+        to_update = []
+        credits = defaultdict(int)
+        for key in wanted:
+            user_id, title = key
+            if key in existing:
+                pk, submitted = existing[key]
+                if submitted:
+                    stats['already_submitted'] += 1
+                    continue
+                to_update.append(pk)
+            else:
+                to_create.append(
+                    FormSubmission(
+                        user_id=user_id, form_title=title, points_earned=points,
+                        submitted=True, submitted_at=now,
+                    )
+                )
+            credits[user_id] += points
+
+        if to_create:
+            FormSubmission.objects.bulk_create(to_create)
+        if to_update:
+            FormSubmission.objects.filter(pk__in=to_update, submitted=False).update(
+                submitted=True, submitted_at=now, points_earned=points
+            )
+
+        # Group users by their increment so each distinct delta is one UPDATE.
+        users_by_delta = defaultdict(list)
+        for user_id, delta in credits.items():
+            users_by_delta[delta].append(user_id)
+        for delta, ids in users_by_delta.items():
+            CustomUser.objects.filter(pk__in=ids).update(points=F('points') + delta)
+
+        record_points_activity_bulk(
+            {
+                user_id: {'earned': delta, 'forms_completed': delta // points}
+                for user_id, delta in credits.items()
+            },
+            when=now,
+        )
+
+    stats['created'] += len(to_create)
+    stats['updated'] += len(to_update)
+    stats['users_credited'] += len(credits)
+    stats['points_credited'] += sum(credits.values())
+
+
+def ingest_form_responses(rows, form_title=None, points=DEFAULT_FORM_POINTS, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Ingest an iterable of response rows and return a dict of counters.
+    Rows without a resolvable email, form title or matching user are counted
+    as unmatched and otherwise ignored.
+    """
+    stats = _new_stats()
+    for batch in _batched(rows, batch_size):
+        _ingest_batch(batch, form_title, points, stats)
+    logger.info(
+        f"Form ingest finished: {stats['rows']} rows, {stats['created']} created, "
+        f"{stats['updated']} updated, {stats['points_credited']} points credited to "
+        f"{stats['users_credited']} users."
+    )
+    return stats
@@ -0,0 +1,145 @@
+"""
+Idempotency-Key support for mutating mobile endpoints.
+
+The first request with a given key claims it by inserting a row for
+(user, key); the unique constraint makes the claim atomic. Its response is
+stored on the row and replayed for every retry until the key expires.
+Retries that arrive while the first request is still running wait briefly
+for it to finish instead of executing the view a second time. A claim left
+unfinished for longer than IDEMPOTENCY_IN_FLIGHT_LEASE_SECONDS is assumed to
+belong to a process that died mid-request and may be claimed again.
+"""
+import functools
+import hashlib
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Idempotency-Key'
+DEFAULT_TTL_SECONDS = 60 * 60 * 24
+DEFAULT_IN_FLIGHT_LEASE_SECONDS = 5 * 60
+# How long a retry waits for an in-flight request with the same key.
+IN_FLIGHT_WAIT_SECONDS = 10
+IN_FLIGHT_POLL_SECONDS = 0.05
+
+
+def _fingerprint(request):
+    """Hash of the method, path and body, so a key reused for another payload is detected."""
+    digest = hashlib.sha256(f'{request.method}:{request.path}'.encode())
+    if request.content_type.startswith('multipart/'):
+        # Uploads can exceed what request.body may hold in memory; hash the parsed form instead.
+        for name, values in sorted(request.POST.lists()):
+            digest.update(f'\0{name}={values!r}'.encode())
+        for name, uploads in sorted(request.FILES.lists()):
+            for upload in uploads:
+                digest.update(f'\0{name}:{upload.name}:'.encode())
+                for chunk in upload.chunks():
+                    digest.update(chunk)
+                upload.seek(0)
+    else:
+        digest.update(b'\0' + request.body)
+    return digest.hexdigest()
+
+
+def _claim(request, key, fingerprint):
+    """Return (record, claimed); claimed is False when another request owns the key."""
+    ttl = getattr(settings, 'IDEMPOTENCY_KEY_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+    lease = getattr(settings, 'IDEMPOTENCY_IN_FLIGHT_LEASE_SECONDS', DEFAULT_IN_FLIGHT_LEASE_SECONDS)
+    now = timezone.now()
+    lease_cutoff = now - timedelta(seconds=lease)
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=request.user, key=key, fingerprint=fingerprint, expires_at=now + timedelta(seconds=ttl)
+                )
+            return record, True
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+            if record is None:
+                # Purged between our insert and lookup; try claiming again.
+                continue
+            if record.expires_at <= now:
+                # Expired keys may be reused: drop the stale row and claim again.
+                IdempotencyKey.objects.filter(pk=record.pk, expires_at__lte=now).delete()
+            elif record.status_code is None and record.created_at <= lease_cutoff:
+                # The claiming request never finished (its process died); take over the key.
+                logger.warning(f"Reclaiming abandoned {HEADER} {key} for {request.user.email}.")
+                IdempotencyKey.objects.filter(
+                    pk=record.pk, status_code__isnull=True, created_at__lte=lease_cutoff
+                ).delete()
+            else:
+                return record, False
+    return None, False
+
+
+def _replay(record):
+    return Response(record.response_body, status=record.status_code, headers={'Idempotent-Replayed': 'true'})
+
+
+def _wait_for_completion(record):
+    deadline = time.monotonic() + IN_FLIGHT_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(IN_FLIGHT_POLL_SECONDS)
+        record = IdempotencyKey.objects.filter(pk=record.pk).first()
+        if record is None or record.status_code is not None:
+            return record
+    return None
+
+
+def idempotent(handler):
+    """
+    Decorate an APIView handler so requests carrying an Idempotency-Key header
+    run at most once per (user, key). Requests without the header are unaffected.
+    Server errors release the key so the client can retry.
+    """
+    @functools.wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return handler(view, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({'error': f'{HEADER} must be at most 255 characters.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        fingerprint = _fingerprint(request)
+        record, claimed = _claim(request, key, fingerprint)
+        if record is None:
+            return Response({'error': f'Could not claim {HEADER}; please retry.'}, status=status.HTTP_409_CONFLICT)
+
+        if not claimed:
+            if record.fingerprint != fingerprint:
+                logger.warning(f"{HEADER} {key} reused by {request.user.email} for a different request.")
+                return Response({'error': f'{HEADER} was already used for a different request.'},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            if record.status_code is None:
+                record = _wait_for_completion(record)
+                if record is None or record.status_code is None:
+                    return Response({'error': 'A request with this Idempotency-Key is still in progress.'},
+                                    status=status.HTTP_409_CONFLICT, headers={'Retry-After': '1'})
+            logger.info(f"Replaying stored response for {HEADER} {key} ({request.user.email}).")
+            return _replay(record)
+
+        try:
+            response = handler(view, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if response.status_code >= 500:
+            record.delete()
+        else:
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                status_code=response.status_code, response_body=response.data
+            )
+        return response
+
+    return wrapper
@@ -0,0 +1,16 @@
+"""
+Entry points for process-pool job workers.
+
+Spawned children unpickle these by importing this module, so it must not import
+models at module level: Django is only set up once init_process() has run.
+"""
+
+
+def init_process():
+    import django
+    django.setup()
+
+
+def execute_job(job_id):
+    from .jobs import execute_job as run
+    return run(job_id)
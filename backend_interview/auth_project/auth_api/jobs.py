@@ -0,0 +1,229 @@
+"""
+Durable, database-backed background job queue.
+
+Views enqueue work with enqueue(); the run_job_worker management command
+claims due jobs per queue and runs them in a thread or process pool. Claiming
+uses SELECT ... FOR UPDATE SKIP LOCKED where the database supports it, so
+several workers can share a queue without blocking each other. Failed jobs are
+retried with exponential backoff until max_attempts is reached. Workers refresh
+locked_at on the jobs they are running and periodically requeue jobs whose
+worker has not done so for JOB_VISIBILITY_TIMEOUT_SECONDS (it crashed or was
+killed); a job that has used up its attempts that way is failed instead, so a
+job that kills its worker cannot loop forever.
+"""
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import job_process
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE = 'default'
+DEFAULT_RETRY_BASE_SECONDS = 5
+DEFAULT_RETRY_MAX_SECONDS = 60 * 60
+DEFAULT_VISIBILITY_TIMEOUT_SECONDS = 10 * 60
+
+_tasks = {}
+
+
+def task(name, queue=DEFAULT_QUEUE, max_attempts=5):
+    """Register a function as a job task under `name`, with its default queue and retry budget."""
+    def register(func):
+        _tasks[name] = (func, queue, max_attempts)
+        func.task_name = name
+        return func
+    return register
+
+
+def enqueue(name, payload=None, user=None, queue=None, run_at=None, max_attempts=None):
+    """
+    Create a pending job for a registered task and return it.
+    Inside a transaction the job becomes visible to workers only once it commits.
+    """
+    if name not in _tasks:
+        raise ValueError(f"Unknown job task: {name}")
+    _, default_queue, default_max_attempts = _tasks[name]
+    job = Job.objects.create(
+        task=name,
+        payload=payload or {},
+        user=user,
+        queue=queue or default_queue,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or default_max_attempts,
+    )
+    logger.info(f"Enqueued job {job.pk} ({name}) on queue '{job.queue}'.")
+    return job
+
+
+def claim_jobs(queue, limit, worker_id):
+    """Atomically mark up to `limit` due jobs of `queue` as running for this worker; return their ids."""
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.PENDING, queue=queue, run_at__lte=now).order_by('run_at', 'id')
+    claim = {'status': Job.RUNNING, 'locked_at': now, 'attempts': F('attempts') + 1}
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            if ids:
+                Job.objects.filter(pk__in=ids).update(locked_by=worker_id, **claim)
+        return ids
+
+    # Without SKIP LOCKED (e.g. SQLite) claim with a single UPDATE ... WHERE id IN
+    # (subquery), tagging the rows so we can read back which ones we won.
+    token = f'{worker_id}:{uuid.uuid4().hex}'
+    claimed = Job.objects.filter(pk__in=due.values('id')[:limit], status=Job.PENDING).update(
+        locked_by=token, **claim
+    )
+    if not claimed:
+        return []
+    return list(Job.objects.filter(locked_by=token).values_list('id', flat=True))
+
+
+def visibility_timeout():
+    return getattr(settings, 'JOB_VISIBILITY_TIMEOUT_SECONDS', DEFAULT_VISIBILITY_TIMEOUT_SECONDS)
+
+
+def requeue_stale_jobs():
+    """
+    Return jobs whose worker stopped reporting (crashed or killed) to the pending state,
+    or fail them when that was their last attempt. Returns the number requeued.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=now - timedelta(seconds=visibility_timeout()))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, locked_by='', locked_at=None, finished_at=now,
+        last_error='Worker stopped while running the job on its last attempt.',
+    )
+    count = stale.update(status=Job.PENDING, locked_by='', locked_at=None)
+    if failed:
+        logger.error(f"Failed {failed} stale running jobs that had no attempts left.")
+    if count:
+        logger.warning(f"Requeued {count} stale running jobs.")
+    return count
+
+
+def touch_jobs(job_ids):
+    """Refresh locked_at on jobs this worker is still running so they are not requeued."""
+    if job_ids:
+        Job.objects.filter(pk__in=job_ids, status=Job.RUNNING).update(locked_at=timezone.now())
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter: base * 2^(attempts - 1), capped."""
+    base = getattr(settings, 'JOB_RETRY_BASE_SECONDS', DEFAULT_RETRY_BASE_SECONDS)
+    cap = getattr(settings, 'JOB_RETRY_MAX_SECONDS', DEFAULT_RETRY_MAX_SECONDS)
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def execute_job(job_id):
+    """Run one claimed job and record its outcome. Safe to call from worker threads or processes."""
+    close_old_connections()
+    try:
+        job = Job.objects.get(pk=job_id)
+        entry = _tasks.get(job.task)
+        try:
+            if entry is None:
+                raise LookupError(f"Unknown job task: {job.task}")
+            result = entry[0](**job.payload)
+        except Exception as e:
+            now = timezone.now()
+            error = f"{type(e).__name__}: {e}"
+            if job.attempts < job.max_attempts:
+                Job.objects.filter(pk=job_id).update(
+                    status=Job.PENDING, locked_by='', locked_at=None, last_error=error,
+                    run_at=now + timedelta(seconds=retry_delay(job.attempts)),
+                )
+                logger.warning(f"Job {job_id} ({job.task}) failed on attempt {job.attempts}, will retry: {error}")
+            else:
+                Job.objects.filter(pk=job_id).update(
+                    status=Job.FAILED, locked_by='', locked_at=None, last_error=error, finished_at=now,
+                )
+                logger.error(f"Job {job_id} ({job.task}) failed permanently after {job.attempts} attempts: {error}")
+            return False
+
+        Job.objects.filter(pk=job_id).update(
+            status=Job.SUCCEEDED, result=result, locked_by='', locked_at=None, finished_at=timezone.now(),
+        )
+        return True
+    finally:
+        close_old_connections()
+
+
+def run_worker(queue_limits, pool='thread', poll_interval=1.0, burst=False, stop=None):
+    """
+    Claim and run jobs until `stop` is set (or, in burst mode, until no due jobs remain).
+    `queue_limits` maps queue name to the maximum number of its jobs running at once.
+    Returns the number of jobs processed.
+    """
+    stop = stop or threading.Event()
+    worker_id = f'{socket.gethostname()}:{os.getpid()}'
+    max_workers = sum(queue_limits.values())
+    if pool == 'process':
+        # Spawned children set Django up themselves instead of inheriting open DB connections.
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=job_process.init_process,
+        )
+        run_job = job_process.execute_job
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job-worker')
+        run_job = execute_job
+
+    inflight = {queue: set() for queue in queue_limits}
+    job_ids = {}
+    processed = 0
+    # Heartbeat and stale-job sweep run several times per visibility timeout.
+    maintenance_interval = max(visibility_timeout() / 4, poll_interval)
+    next_maintenance = 0
+    logger.info(f"Job worker {worker_id} started for queues {queue_limits} ({pool} pool).")
+    with executor:
+        while not stop.is_set():
+            if time.monotonic() >= next_maintenance:
+                touch_jobs(list(job_ids.values()))
+                requeue_stale_jobs()
+                next_maintenance = time.monotonic() + maintenance_interval
+
+            claimed = 0
+            for queue, limit in queue_limits.items():
+                done = {future for future in inflight[queue] if future.done()}
+                processed += len(done)
+                inflight[queue] -= done
+                for future in done:
+                    del job_ids[future]
+                free = limit - len(inflight[queue])
+                if free > 0:
+                    for job_id in claim_jobs(queue, free, worker_id):
+                        future = executor.submit(run_job, job_id)
+                        inflight[queue].add(future)
+                        job_ids[future] = job_id
+                        claimed += 1
+
+            running = set().union(*inflight.values())
+            if running:
+                wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            elif not claimed:
+                if burst:
+                    break
+                stop.wait(poll_interval)
+
+        for queue in inflight:
+            wait(inflight[queue])
+            processed += len(inflight[queue])
+    logger.info(f"Job worker {worker_id} stopped after {processed} jobs.")
+    return processed
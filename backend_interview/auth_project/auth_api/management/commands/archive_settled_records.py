@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_api.archive import (
+    ARCHIVABLE,
+    DEFAULT_ARCHIVE_BATCH_SIZE,
+    archive_settled,
+    purge_expired_idempotency_keys,
+    purge_expired_tokens,
+    reject_stale_redemptions,
+    settled_counts,
+)
+
+PURGEABLE = ['tokens', 'idempotency_keys', 'stale_redemptions']
+
+
+class Command(BaseCommand):
+    help = (
+        "Move approved redemptions and submitted forms older than the archive horizon "
+        "into the archive tables, purge long-expired tokens and idempotency keys, and reject "
+        "redemption requests pending longer than settings.REDEMPTION_PENDING_DAYS. "
+        "Submissions recorded before submitted_at existed have no timestamp; they are "
+        "archived once the migration that added the column is older than the horizon."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help="Archive horizon in days. Defaults to settings.ARCHIVE_AFTER_DAYS.")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help="Stop after this many batches per table, to bound a single run.")
+        parser.add_argument('--only', choices=sorted(ARCHIVABLE) + PURGEABLE, default=None,
+                            help="Only process one kind of record.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report how many rows would be processed without moving them.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError("--batch-size must be greater than zero.")
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError("--days cannot be negative.")
+
+        kinds = [options['only']] if options['only'] else sorted(ARCHIVABLE) + PURGEABLE
+        if options['dry_run']:
+            counts = settled_counts(options['days'])
+            for kind in kinds:
+                self.stdout.write(f"{kind}: {counts[kind]} eligible")
+            return
+
+        batching = {
+            'days': options['days'],
+            'batch_size': options['batch_size'],
+            'max_batches': options['max_batches'],
+        }
+        for kind in kinds:
+            if kind == 'tokens':
+                count = purge_expired_tokens(**batching)
+                self.stdout.write(f"tokens: {count} purged")
+            elif kind == 'idempotency_keys':
+                # Keys expire on their own TTL, not the archive horizon.
+                count = purge_expired_idempotency_keys(options['batch_size'], options['max_batches'])
+                self.stdout.write(f"idempotency_keys: {count} purged")
+            elif kind == 'stale_redemptions':
+                # Pending requests expire on their own horizon, not the archive one.
+                count = reject_stale_redemptions(options['batch_size'], options['max_batches'])
+                self.stdout.write(f"stale_redemptions: {count} rejected")
+            else:
+                count = archive_settled(kind, **batching)
+                self.stdout.write(f"{kind}: {count} archived")
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_api.jobs import enqueue, run_worker
+from auth_api.models import Job
+
+BENCH_QUEUE = 'bench'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure job queue throughput: enqueue no-op jobs on a dedicated queue, drain it "
+        "with the worker loop and report jobs/sec. The bench jobs are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--sleep-ms', type=int, default=0,
+                            help="Simulated work per job, e.g. an S3 round trip.")
+
+    def handle(self, *args, **options):
+        if options['jobs'] <= 0 or options['concurrency'] <= 0 or options['sleep_ms'] < 0:
+            raise CommandError("--jobs and --concurrency must be positive and --sleep-ms non-negative.")
+
+        Job.objects.filter(queue=BENCH_QUEUE).delete()
+        try:
+            started = time.perf_counter()
+            for _ in range(options['jobs']):
+                enqueue('noop', {'sleep_ms': options['sleep_ms']}, queue=BENCH_QUEUE)
+            enqueue_elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            run_worker({BENCH_QUEUE: options['concurrency']}, pool=options['pool'], poll_interval=0.05, burst=True)
+            run_elapsed = time.perf_counter() - started
+
+            succeeded = Job.objects.filter(queue=BENCH_QUEUE, status=Job.SUCCEEDED).count()
+            self.stdout.write(f"jobs:       {options['jobs']} ({succeeded} succeeded)")
+            self.stdout.write(f"enqueue:    {enqueue_elapsed:.2f}s ({options['jobs'] / enqueue_elapsed:.0f} jobs/s)")
+            self.stdout.write(
+                f"processing: {run_elapsed:.2f}s ({options['jobs'] / run_elapsed:.0f} jobs/s, "
+                f"{options['pool']} pool x{options['concurrency']})"
+            )
+        finally:
+            Job.objects.filter(queue=BENCH_QUEUE).delete()
@@ -0,0 +1,77 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from auth_api.catalog import expire_catalog_version
+from auth_api.models import CustomUser, Reward, RewardRedemption
+from auth_api.views import RedeemRewardView
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark many concurrent redeemers competing for one limited-stock reward through "
+        "the redeem endpoint, and verify the stock is never oversold. Creates a temporary "
+        "reward and bench users and removes them afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--redeemers', type=int, default=2000, help="Total redemption attempts.")
+        parser.add_argument('--stock', type=int, default=100, help="Units of the limited reward.")
+        parser.add_argument('--workers', type=int, default=32, help="Concurrent worker threads.")
+        parser.add_argument('--users', type=int, default=50, help="Bench users the attempts rotate through.")
+
+    def handle(self, *args, **options):
+        if min(options['redeemers'], options['workers'], options['users']) <= 0 or options['stock'] < 0:
+            raise CommandError("Counts must be greater than zero and stock cannot be negative.")
+
+        run_id = uuid.uuid4().hex[:8]
+        reward = Reward.objects.create(name=f'bench-{run_id}', points_cost=10, stock=options['stock'])
+        expire_catalog_version()
+        # Enough points that every attempt is decided by stock alone.
+        users = [
+            CustomUser.objects.create_user(f'bench-{run_id}-{i}@bench.invalid', points=10 * options['redeemers'])
+            for i in range(options['users'])
+        ]
+        factory = APIRequestFactory()
+        view = RedeemRewardView.as_view()
+
+        def redeem(attempt):
+            request = factory.post('/api/redeem_reward/', {'reward_id': reward.pk}, format='json')
+            force_authenticate(request, user=users[attempt % len(users)])
+            started = time.perf_counter()
+            response = view(request)
+            return response.status_code, time.perf_counter() - started
+
+        def redeem_in_worker(attempt):
+            try:
+                return redeem(attempt)
+            finally:
+                connections.close_all()
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                results = list(pool.map(redeem_in_worker, range(options['redeemers'])))
+            elapsed = time.perf_counter() - started
+
+            statuses = {}
+            for status_code, _ in results:
+                statuses[status_code] = statuses.get(status_code, 0) + 1
+            latencies = sorted(duration * 1000 for _, duration in results)
+            reward.refresh_from_db()
+            created = RewardRedemption.objects.filter(reward=reward).count()
+
+            self.stdout.write(f"attempts:        {len(results)}")
+            self.stdout.write(f"elapsed:         {elapsed:.2f}s ({len(results) / elapsed:.0f} req/s)")
+            self.stdout.write(f"p50 / p99 ms:    {latencies[len(latencies) // 2]:.1f} / {latencies[int(len(latencies) * 0.99)]:.1f}")
+            self.stdout.write(f"status counts:   {dict(sorted(statuses.items()))}")
+            self.stdout.write(f"redemptions:     {created} (stock {options['stock']}, remaining {reward.stock})")
+            if created + reward.stock != options['stock']:
+                raise CommandError("Stock accounting mismatch: reward was oversold or leaked units.")
+        finally:
+            CustomUser.objects.filter(pk__in=[user.pk for user in users]).delete()
+            reward.delete()
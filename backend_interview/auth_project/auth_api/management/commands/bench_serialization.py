@@ -0,0 +1,79 @@
+import gzip
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from auth_api.renderers import FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure render time and payload size for a redemption-list response with DRF's "
+        "JSON renderer, the orjson renderer and MessagePack, raw and compressed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5, help="Renders per renderer; the best time is reported.")
+
+    def handle(self, *args, **options):
+        if options['rows'] <= 0 or options['repeat'] <= 0:
+            raise CommandError("--rows and --repeat must be greater than zero.")
+
+        now = timezone.now()
+        # Same shape RedemptionRequestsView returns.
+        data = {'requests': [
+            {
+                'id': i,
+                'user_email': f'user{i % 500}@example.com',
+                'reward_name': ('Sports T-shirt', 'Event Ticket', 'Personalized Trophy')[i % 3],
+                'reward_points': (500, 20, 1000)[i % 3],
+                'approved': i % 2 == 0,
+                'points_deducted': i % 2 == 0,
+                'request_date': (now - timedelta(minutes=i)).isoformat(),
+                'approval_date': now.isoformat() if i % 2 == 0 else None,
+                'status': 'approved' if i % 2 == 0 else 'pending',
+            }
+            for i in range(options['rows'])
+        ]}
+
+        renderers = [('drf json', JSONRenderer())]
+        if orjson is not None:
+            renderers.append(('orjson', FastJSONRenderer()))
+        else:
+            self.stderr.write("orjson is not installed; FastJSONRenderer falls back to DRF and is skipped.")
+        if msgpack is not None:
+            renderers.append(('msgpack', MessagePackRenderer()))
+        else:
+            self.stderr.write("msgpack is not installed; skipping MessagePack.")
+
+        self.stdout.write(f"{options['rows']} rows, best of {options['repeat']}")
+        header = f"{'renderer':<10}{'render ms':>11}{'bytes':>11}{'gzip':>10}{'gzip ms':>9}"
+        if brotli is not None:
+            header += f"{'br':>10}{'br ms':>8}"
+        self.stdout.write(header)
+        for name, renderer in renderers:
+            body, render_ms = self._best(lambda: renderer.render(data), options['repeat'])
+            gzipped, gzip_ms = self._best(lambda: gzip.compress(body, compresslevel=6, mtime=0), options['repeat'])
+            line = f"{name:<10}{render_ms:>11.2f}{len(body):>11}{len(gzipped):>10}{gzip_ms:>9.2f}"
+            if brotli is not None:
+                compressed, br_ms = self._best(lambda: brotli.compress(body, quality=4), options['repeat'])
+                line += f"{len(compressed):>10}{br_ms:>8.2f}"
+            self.stdout.write(line)
+
+    def _best(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = (time.perf_counter() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return result, best
@@ -0,0 +1,128 @@
+import statistics
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from auth_api.models import CustomUser
+from auth_api.views import SignInView
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark legitimate sign-in latency alone and under a concurrent credential-stuffing "
+        "load, with the sign-in rate limiter on and off. Creates temporary bench users and "
+        "removes them afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20, help="Legitimate logins measured per scenario.")
+        parser.add_argument('--users', type=int, default=10, help="Legitimate users (and client IPs) the logins rotate through.")
+        parser.add_argument('--attackers', type=int, default=4, help="Concurrent attacker threads.")
+        parser.add_argument('--attack-rate', type=float, default=40.0,
+                            help="Total attack requests per second offered across all attacker threads.")
+        parser.add_argument('--attacker-ips', type=int, default=2, help="Distinct client IPs the attack comes from.")
+        parser.add_argument('--warmup', type=float, default=5.0,
+                            help="Seconds the attack runs before legitimate logins are measured.")
+
+    def handle(self, *args, **options):
+        if min(options['logins'], options['users'], options['attackers'], options['attacker_ips']) <= 0:
+            raise CommandError("All counts must be greater than zero.")
+        if options['attack_rate'] <= 0:
+            raise CommandError("--attack-rate must be greater than zero.")
+        if options['warmup'] < 0:
+            raise CommandError("--warmup cannot be negative.")
+
+        self.factory = APIRequestFactory()
+        self.view = SignInView.as_view()
+        self.password = 'bench-password-123'
+        run_id = uuid.uuid4().hex[:8]
+        users = [
+            CustomUser.objects.create_user(f'bench-{run_id}-{i}@bench.invalid', self.password)
+            for i in range(options['users'])
+        ]
+        try:
+            scenarios = [
+                ('baseline', False, True),
+                ('attack, limiter on', True, True),
+                ('attack, limiter off', True, False),
+            ]
+            self.stdout.write(f"{'scenario':<22}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'attack req':>12}{'rejected':>10}")
+            for name, attack, limited in scenarios:
+                caches[getattr(settings, 'SIGNIN_RATE_LIMIT_CACHE', 'default')].clear()
+                overrides = {} if limited else {'SIGNIN_RATE_LIMITS': {}}
+                with override_settings(**overrides):
+                    latencies, sent, rejected = self._run_scenario(users, attack, options)
+                latencies.sort()
+                p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                self.stdout.write(
+                    f"{name:<22}{statistics.median(latencies):>9.1f}{p95:>9.1f}{latencies[-1]:>9.1f}"
+                    f"{sent:>12}{rejected:>10}"
+                )
+        finally:
+            CustomUser.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def _sign_in(self, email, password, ip):
+        request = self.factory.post(
+            '/api/signin/', {'email': email, 'password': password}, format='json', REMOTE_ADDR=ip
+        )
+        return self.view(request)
+
+    def _attack(self, worker, stop, counters, lock, options):
+        # Open-loop load: each thread offers requests on a fixed schedule and only
+        # skips sleeping when the server is slower than the schedule.
+        interval = options['attackers'] / options['attack_rate']
+        next_send = time.perf_counter()
+        sent = rejected = 0
+        try:
+            while not stop.is_set():
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    stop.wait(delay)
+                next_send += interval
+                ip = f"203.0.113.{(worker + sent) % options['attacker_ips'] + 1}"
+                response = self._sign_in(f'victim-{uuid.uuid4().hex[:12]}@bench.invalid', 'guess', ip)
+                sent += 1
+                if response.status_code == 429:
+                    rejected += 1
+        finally:
+            connections.close_all()
+            with lock:
+                counters['sent'] += sent
+                counters['rejected'] += rejected
+
+    def _run_scenario(self, users, attack, options):
+        stop = threading.Event()
+        lock = threading.Lock()
+        counters = {'sent': 0, 'rejected': 0}
+        threads = []
+        if attack:
+            threads = [
+                threading.Thread(target=self._attack, args=(i, stop, counters, lock, options))
+                for i in range(options['attackers'])
+            ]
+            for thread in threads:
+                thread.start()
+            # Let the attack reach steady state (and the limiter trip) before measuring.
+            time.sleep(options['warmup'])
+
+        latencies = []
+        try:
+            for i in range(options['logins']):
+                user_index = i % len(users)
+                started = time.perf_counter()
+                response = self._sign_in(users[user_index].email, self.password, f'10.1.0.{user_index + 1}')
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f"Legitimate sign-in failed with status {response.status_code}.")
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        return latencies, counters['sent'], counters['rejected']
@@ -0,0 +1,67 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from auth_api.models import CustomUser, RewardRedemption
+
+SCENARIOS = [
+    ('profile', '/api/user-profile/'),
+    ('profile points', '/api/user-profile/?fields=points'),
+    ('redemptions', '/api/redemption_requests/'),
+    ('redemptions id,status', '/api/redemption_requests/?fields=id,status'),
+    ('redemptions +email', '/api/redemption_requests/?fields=id,status,user_email'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure queries, response size and latency of the profile and redemption-list "
+        "endpoints with and without ?fields= projections. Creates a temporary user with "
+        "redemptions and deletes it afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--redemptions', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=50, help="Requests per scenario; the mean is reported.")
+        parser.add_argument('--show-sql', action='store_true', help="Print the SQL of the points-only profile request.")
+
+    def handle(self, *args, **options):
+        if options['redemptions'] < 0 or options['repeat'] <= 0:
+            raise CommandError("--redemptions must be non-negative and --repeat greater than zero.")
+
+        user = CustomUser.objects.create_user(f'bench-{uuid.uuid4().hex[:12]}@example.com', 'unused', points=1000)
+        try:
+            RewardRedemption.objects.bulk_create(
+                RewardRedemption(user=user, reward_name=f'Reward {i}', reward_points=10, approved=bool(i % 2))
+                for i in range(options['redemptions'])
+            )
+            token = Token.objects.create(user=user)
+            client = APIClient(HTTP_HOST='localhost')
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+            self.stdout.write(f"{options['redemptions']} redemptions, mean of {options['repeat']} requests")
+            self.stdout.write(f"{'scenario':<24}{'queries':>8}{'bytes':>10}{'ms':>8}")
+            for label, path in SCENARIOS:
+                # Django resets connection.queries at request start, so record SQL with a wrapper.
+                queries = []
+                with connection.execute_wrapper(
+                    lambda execute, sql, params, many, context: queries.append(sql) or execute(sql, params, many, context)
+                ):
+                    response = client.get(path)
+                if response.status_code != 200:
+                    raise CommandError(f"{path} returned {response.status_code}: {response.content[:200]!r}")
+                if options['show_sql'] and label == 'profile points':
+                    for sql in queries:
+                        self.stdout.write(f"  {sql}")
+
+                started = time.perf_counter()
+                for _ in range(options['repeat']):
+                    client.get(path)
+                elapsed = (time.perf_counter() - started) / options['repeat']
+                self.stdout.write(f"{label:<24}{len(queries):>8}{len(response.content):>10}{elapsed * 1000:>8.2f}")
+        finally:
+            user.delete()
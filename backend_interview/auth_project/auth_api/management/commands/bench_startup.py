@@ -0,0 +1,110 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter per sample: time Django setup plus URLconf and
+# handler loading ("import"), then the profile's first unit of work.
+PROBE = '''
+import json, os, sys, time
+from importlib import import_module
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+import django
+from django.conf import settings
+django.setup()
+import_module(settings.ROOT_URLCONF)
+path = sys.argv[1]
+if path:
+    from django.core.handlers.wsgi import WSGIHandler
+    handler = WSGIHandler()
+ready = time.perf_counter()
+
+if path:
+    environ = {'HTTP_HOST': 'localhost', 'PATH_INFO': path}
+    setup_testing_defaults(environ)
+    statuses = []
+    response = handler(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    b''.join(response)
+    response.close()
+    outcome = statuses[0]
+else:
+    from auth_api.jobs import claim_jobs
+    outcome = f"claimed {len(claim_jobs('bench-startup', 1, 'bench'))} jobs"
+done = time.perf_counter()
+
+print(json.dumps({
+    'import_ms': (ready - started) * 1000,
+    'first_ms': (done - ready) * 1000,
+    'outcome': outcome,
+    'modules': len(sys.modules),
+    'boto3': 'boto3' in sys.modules,
+}))
+'''
+
+# First unit of work per profile: an HTTP path, or None for a worker's first queue poll.
+FIRST_REQUEST = {
+    'full': '/api/rewards/',
+    'api': '/api/rewards/',
+    'admin': '/admin/login/',
+    'worker': None,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start per settings profile: each sample starts a fresh interpreter "
+        "and reports import time (Django setup, URLconf and handler), time to first "
+        "request, total process time and the number of loaded modules."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', default=','.join(FIRST_REQUEST),
+                            help="Comma-separated settings profiles to measure.")
+        parser.add_argument('--repeat', type=int, default=5, help="Samples per profile; medians are reported.")
+
+    def handle(self, *args, **options):
+        profiles = [profile.strip() for profile in options['profiles'].split(',') if profile.strip()]
+        unknown = set(profiles) - set(FIRST_REQUEST)
+        if unknown:
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown))}.")
+        if options['repeat'] <= 0:
+            raise CommandError("--repeat must be greater than zero.")
+
+        self.stdout.write(f"median of {options['repeat']} cold starts per profile")
+        self.stdout.write(
+            f"{'profile':<8}{'import ms':>11}{'first ms':>10}{'process ms':>12}{'modules':>9}{'boto3':>7}  first request"
+        )
+        for profile in profiles:
+            samples = [self._sample(profile) for _ in range(options['repeat'])]
+            first = samples[0]
+            self.stdout.write(
+                f"{profile:<8}"
+                f"{statistics.median(s['import_ms'] for s in samples):>11.0f}"
+                f"{statistics.median(s['first_ms'] for s in samples):>10.0f}"
+                f"{statistics.median(s['process_ms'] for s in samples):>12.0f}"
+                f"{first['modules']:>9}"
+                f"{'yes' if first['boto3'] else 'no':>7}"
+                f"  {FIRST_REQUEST[profile] or 'queue poll'} -> {first['outcome']}"
+            )
+
+    def _sample(self, profile):
+        env = {**os.environ, 'DJANGO_SETTINGS_PROFILE': profile}
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'auth_project.settings')
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, '-c', PROBE, FIRST_REQUEST[profile] or ''],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if proc.returncode != 0:
+            raise CommandError(f"Profile '{profile}' failed to start:\n{proc.stderr}")
+        sample = json.loads(proc.stdout.strip().splitlines()[-1])
+        sample['process_ms'] = elapsed * 1000
+        return sample
@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_api.form_ingest import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_FORM_POINTS,
+    MAX_BATCH_SIZE,
+    ingest_form_responses,
+    iter_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Ingest a Google Forms response export (CSV or NDJSON) and credit form points."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path to the export file, or '-' to read from stdin.")
+        parser.add_argument('--format', choices=['csv', 'ndjson'], default=None,
+                            help="Input format. Defaults to the file extension, or csv for stdin.")
+        parser.add_argument('--form-title', default=None,
+                            help="Form title applied to rows that do not carry their own form_title column.")
+        parser.add_argument('--points', type=int, default=DEFAULT_FORM_POINTS)
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format']
+        if fmt is None:
+            fmt = 'ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv'
+        if options['points'] <= 0:
+            raise CommandError("--points must be greater than zero.")
+        if not 0 < options['batch_size'] <= MAX_BATCH_SIZE:
+            raise CommandError(f"--batch-size must be between 1 and {MAX_BATCH_SIZE}.")
+
+        if path == '-':
+            stats = self._ingest(sys.stdin, fmt, options)
+        else:
+            try:
+                with open(path, newline='', encoding='utf-8-sig') as handle:
+                    stats = self._ingest(handle, fmt, options)
+            except OSError as e:
+                raise CommandError(f"Could not read {path}: {e}")
+
+        for key, value in stats.items():
+            self.stdout.write(f"{key}: {value}")
+
+    def _ingest(self, lines, fmt, options):
+        return ingest_form_responses(
+            iter_rows(lines, fmt),
+            form_title=options['form_title'],
+            points=options['points'],
+            batch_size=options['batch_size'],
+        )
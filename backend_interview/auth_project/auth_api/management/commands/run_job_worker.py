@@ -0,0 +1,64 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_api.jobs import run_worker
+
+
+def parse_queue_limits(value):
+    """Parse 'default=4,uploads=2' (a bare name uses a limit of 1) into a dict."""
+    limits = {}
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, limit = part.partition('=')
+        try:
+            limits[name.strip()] = int(limit) if limit else 1
+        except ValueError:
+            raise CommandError(f"Invalid queue limit: {part}")
+        if limits[name.strip()] <= 0:
+            raise CommandError(f"Queue limit must be greater than zero: {part}")
+    return limits
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the database-backed queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queues', default=None,
+                            help="Comma-separated queue=concurrency pairs, e.g. 'default=4,uploads=2'. "
+                                 "Defaults to settings.JOB_QUEUE_CONCURRENCY.")
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to wait between polls when the queues are empty.")
+        parser.add_argument('--burst', action='store_true',
+                            help="Exit once no due jobs remain instead of polling forever.")
+
+    def handle(self, *args, **options):
+        if options['queues']:
+            queue_limits = parse_queue_limits(options['queues'])
+        else:
+            queue_limits = dict(getattr(settings, 'JOB_QUEUE_CONCURRENCY', {'default': 1}))
+        if not queue_limits:
+            raise CommandError("No queues to work on.")
+
+        stop = threading.Event()
+
+        def request_stop(signum, frame):
+            self.stdout.write("Stopping after in-flight jobs finish...")
+            stop.set()
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+
+        processed = run_worker(
+            queue_limits,
+            pool=options['pool'],
+            poll_interval=options['poll_interval'],
+            burst=options['burst'],
+            stop=stop,
+        )
+        self.stdout.write(f"Processed {processed} jobs.")
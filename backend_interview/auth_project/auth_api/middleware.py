@@ -0,0 +1,65 @@
+"""
+Response compression for large API payloads.
+
+Unlike Django's GZipMiddleware, which compresses anything over 200 bytes,
+this only compresses API payloads above RESPONSE_COMPRESSION_MIN_BYTES, so small
+bodies such as sign-in tokens are sent as-is. Brotli is preferred when the
+optional brotli package is installed and the client accepts it.
+"""
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MIN_BYTES = 1024
+# Only API payloads are compressed; HTML pages such as the admin carry CSRF tokens
+# alongside reflected input and are left uncompressed.
+COMPRESSIBLE_TYPES = ('application/json', 'application/msgpack', 'text/csv', 'application/x-ndjson')
+
+_accepts_br = _lazy_re_compile(r'\bbr\b')
+_accepts_gzip = _lazy_re_compile(r'\bgzip\b')
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        # Streaming exports manage their own (optional) gzip.
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return response
+
+        min_bytes = getattr(settings, 'RESPONSE_COMPRESSION_MIN_BYTES', DEFAULT_MIN_BYTES)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < min_bytes:
+            return response
+
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and _accepts_br.search(accept_encoding):
+            encoding, compressed = 'br', brotli.compress(response.content, quality=4)
+        elif _accepts_gzip.search(accept_encoding):
+            encoding, compressed = 'gzip', gzip.compress(response.content, compresslevel=6, mtime=0)
+        else:
+            return response
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The body changed, so a strong ETag no longer matches byte-for-byte.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='formsubmission',
+            name='submitted_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_api', '0002_formsubmission_submitted_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyPointsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('earned', models.BigIntegerField(default=0)),
+                ('redeemed', models.BigIntegerField(default=0)),
+                ('forms_completed', models.IntegerField(default=0)),
+                ('achievements_uploaded', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserDailyPointsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('earned', models.IntegerField(default=0)),
+                ('redeemed', models.IntegerField(default=0)),
+                ('forms_completed', models.IntegerField(default=0)),
+                ('achievements_uploaded', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_points', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='userdailypointsrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'day'), name='unique_user_daily_points_rollup'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_api', '0004_archive_tables'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='achievementimage',
+            name='uploaded_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='customtoken',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='customtoken',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='customuser',
+            name='date_joined',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='rewardredemption',
+            name='requested_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='rewardredemption',
+            index=models.Index(fields=['approved', '-requested_at'], name='redemption_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+# The rewards the Flutter redeem screen has always offered, so existing clients
+# that redeem by name keep working against the catalog.
+INITIAL_REWARDS = [
+    ('Sports T-shirt', 'High-quality sports t-shirt with team logo', 500),
+    ('Event Ticket', 'Premium ticket to the upcoming championship game', 20),
+    ('Personalized Trophy', 'Custom engraved trophy with your name', 1000),
+]
+
+
+def seed_rewards(apps, schema_editor):
+    Reward = apps.get_model('auth_api', 'Reward')
+    RewardRedemption = apps.get_model('auth_api', 'RewardRedemption')
+    for name, description, points_cost in INITIAL_REWARDS:
+        reward, _ = Reward.objects.get_or_create(
+            name=name, defaults={'description': description, 'points_cost': points_cost}
+        )
+        RewardRedemption.objects.filter(reward__isnull=True, reward_name=name).update(reward=reward)
+
+
+def unseed_rewards(apps, schema_editor):
+    Reward = apps.get_model('auth_api', 'Reward')
+    Reward.objects.filter(name__in=[name for name, _, _ in INITIAL_REWARDS]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_api', '0006_reward_catalog'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_rewards, unseed_rewards),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_api', '0009_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rewardredemption',
+            name='rejected_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
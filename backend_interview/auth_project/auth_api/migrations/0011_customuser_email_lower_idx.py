@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:18
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('auth_api', '0010_rewardredemption_rejected_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='customuser_email_lower_idx'),
+        ),
+    ]
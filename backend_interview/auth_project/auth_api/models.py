@@ -1,9 +1,13 @@
-from django.db import models, transaction
+from django.db import models, transaction, IntegrityError
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 from datetime import timedelta
 from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.db.models.functions import Lower
+from collections import defaultdict
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,24 +32,31 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     points = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
-    date_joined = models.DateTimeField(auto_now_add=True)
+    date_joined = models.DateTimeField(auto_now_add=True, db_index=True)
     
     objects = CustomUserManager()
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
+    class Meta:
+        indexes = [
+            # Serves case-insensitive email matching in form response ingest.
+            models.Index(Lower('email'), name='customuser_email_lower_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
     def forms_submitted_count(self):
-        return self.formsubmission_set.filter(submitted=True).count()
+        # Archived submissions are always settled, so they all count as submitted.
+        return self.formsubmission_set.filter(submitted=True).count() + self.archived_form_submissions.count()
 
 class CustomToken(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     token = models.CharField(max_length=255, unique=True)
-    created_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
 
     def is_expired(self):
         return timezone.now() > self.expires_at
@@ -63,6 +74,7 @@ class FormSubmission(models.Model):
     form_title = models.CharField(max_length=255)
     points_earned = models.IntegerField(default=20)
     submitted = models.BooleanField(default=False)
+    submitted_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     def __str__(self):
         status = 'Submitted' if self.submitted else 'Not Submitted'
@@ -79,10 +91,15 @@ class FormSubmission(models.Model):
                 update_points = True
 
         if update_points:
+            if not self.submitted_at:
+                self.submitted_at = timezone.now()
             try:
                 with transaction.atomic():
                     self.user.points += self.points_earned
                     self.user.save()
+                    record_points_activity(
+                        self.user_id, self.submitted_at, earned=self.points_earned, forms_completed=1
+                    )
                     logger.info(
                         f"User {self.user.email} earned {self.points_earned} points for form '{self.form_title}'. Total points: {self.user.points}"
                     )
@@ -97,26 +114,106 @@ class FormSubmission(models.Model):
 class AchievementImage(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='achievement_images')
     image_url = models.URLField(max_length=1024)
-    uploaded_at = models.DateTimeField(auto_now_add=True)
+    uploaded_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         return f"AchievementImage for {self.user.email} uploaded at {self.uploaded_at}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                record_points_activity(self.user_id, self.uploaded_at, achievements_uploaded=1)
+
+class Reward(models.Model):
+    """
+    A redeemable catalog item. Stock of None means unlimited; limited stock is
+    reserved with a single conditional decrement rather than a row lock, so
+    save() leaves stock alone unless it was changed on the instance; restock()
+    adds to it in place. updated_at drives the catalog version, so changes made
+    outside save() that catalog snapshots must see (released stock, a sell-out)
+    touch it too.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    description = models.TextField(blank=True)
+    points_cost = models.IntegerField()
+    stock = models.PositiveIntegerField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.points_cost} points)"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_stock = instance.__dict__.get('stock', models.DEFERRED)
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.points_cost <= 0:
+            raise ValidationError("Reward points cost must be greater than zero.")
+        loaded_stock = getattr(self, '_loaded_stock', models.DEFERRED)
+        if (not self._state.adding and kwargs.get('update_fields') is None
+                and loaded_stock is not models.DEFERRED and self.stock == loaded_stock):
+            # Writing back the stock loaded earlier would undo reservations made since.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'stock'
+            ]
+        super().save(*args, **kwargs)
+        self._loaded_stock = self.stock
+
+    @classmethod
+    def restock(cls, pk, count):
+        """Add `count` units to limited stock without overwriting concurrent reservations."""
+        return cls.objects.filter(pk=pk, stock__isnull=False).update(
+            stock=F('stock') + count, updated_at=timezone.now()
+        ) == 1
+
+    @classmethod
+    def reserve(cls, pk):
+        """Take one unit of limited stock; returns False when the reward is sold out."""
+        return cls.objects.filter(pk=pk, stock__gt=0).update(stock=F('stock') - 1) == 1
+
+    @classmethod
+    def release(cls, pk, count=1):
+        """Return limited stock taken by reserve(); snapshots may show it sold out, so refresh them."""
+        cls.objects.filter(pk=pk, stock__isnull=False).update(stock=F('stock') + count, updated_at=timezone.now())
+
+    @classmethod
+    def mark_sold_out(cls, pk):
+        """Refresh catalog snapshots that still show stock for a reward reserve() found sold out."""
+        cls.objects.filter(pk=pk, stock=0).update(updated_at=timezone.now())
+
+
 class RewardRedemption(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='reward_redemptions')
+    reward = models.ForeignKey(Reward, on_delete=models.SET_NULL, null=True, blank=True, related_name='redemptions')
     reward_name = models.CharField(max_length=255)
     reward_points = models.IntegerField()
     approved = models.BooleanField(default=False)
-    requested_at = models.DateTimeField(auto_now_add=True)
+    requested_at = models.DateTimeField(auto_now_add=True, db_index=True)
     approved_at = models.DateTimeField(null=True, blank=True)
     points_deducted = models.BooleanField(default=False)
+    # Set when a pending request is rejected; the row is kept as history.
+    rejected_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Serves the admin approval queue: pending requests, newest first.
+            models.Index(fields=['approved', '-requested_at'], name='redemption_queue_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.reward_name} - {self.status}"
 
     @property
     def status(self):
-        return "Approved" if self.approved else "Pending"
+        if self.approved:
+            return "Approved"
+        return "Rejected" if self.rejected_at else "Pending"
 
     def save(self, *args, **kwargs):
         """
@@ -129,6 +226,9 @@ class RewardRedemption(models.Model):
                 logger.error(f"Invalid reward points ({self.reward_points}) for {self.reward_name}. Must be positive.")
                 raise ValidationError("Reward points must be greater than zero.")
 
+            if self.approved and self.rejected_at:
+                raise ValidationError("A rejected redemption cannot be approved.")
+
             # If the reward is being approved and points are not deducted yet
             if self.approved and not self.points_deducted:
                 user = CustomUser.objects.select_for_update().get(pk=self.user.pk)
@@ -151,8 +251,238 @@ class RewardRedemption(models.Model):
                 # Update points_deducted and approval timestamp
                 self.points_deducted = True
                 self.approved_at = timezone.now()
+                record_points_activity(user.pk, self.approved_at, redeemed=self.reward_points)
 
             # Save the redemption record with the updated fields
             super().save(*args, **kwargs)
             logger.info(f"Reward redemption for {self.user.email} ({self.reward_name}) has been successfully processed.")
 
+
+def reject_reward_redemptions(redemptions):
+    """
+    Mark the pending redemptions in `redemptions` rejected and return the stock they
+    reserved. Used when an admin rejects requests and when they stay pending too long.
+    Returns the number rejected.
+    """
+    with transaction.atomic():
+        pending = list(
+            redemptions.select_for_update()
+            .filter(approved=False, rejected_at__isnull=True)
+            .values_list('id', 'reward_id')
+        )
+        if not pending:
+            return 0
+        RewardRedemption.objects.filter(pk__in=[pk for pk, _ in pending]).update(rejected_at=timezone.now())
+        reserved = defaultdict(int)
+        for _, reward_id in pending:
+            if reward_id is not None:
+                reserved[reward_id] += 1
+        for reward_id, count in reserved.items():
+            Reward.release(reward_id, count)
+    logger.info(f"Rejected {len(pending)} pending reward redemptions and released their stock.")
+    return len(pending)
+
+
+
+# --------------------- Points History Rollups ---------------------
+
+ROLLUP_COUNTERS = ('earned', 'redeemed', 'forms_completed', 'achievements_uploaded')
+
+
+class DailyPointsRollup(models.Model):
+    """Site-wide points activity totals for one day."""
+    day = models.DateField(unique=True)
+    earned = models.BigIntegerField(default=0)
+    redeemed = models.BigIntegerField(default=0)
+    forms_completed = models.IntegerField(default=0)
+    achievements_uploaded = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Points rollup for {self.day}"
+
+
+class UserDailyPointsRollup(models.Model):
+    """Points activity totals for one user on one day."""
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='daily_points')
+    day = models.DateField()
+    earned = models.IntegerField(default=0)
+    redeemed = models.IntegerField(default=0)
+    forms_completed = models.IntegerField(default=0)
+    achievements_uploaded = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='unique_user_daily_points_rollup'),
+        ]
+
+    def __str__(self):
+        return f"Points rollup for {self.user_id} on {self.day}"
+
+
+def _increment_rollup(model, lookup, deltas):
+    # Increment in place; only the first write of the day inserts the row.
+    increments = {name: F(name) + value for name, value in deltas.items()}
+    if model.objects.filter(**lookup).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another writer inserted the row first; fall back to incrementing it.
+        model.objects.filter(**lookup).update(**increments)
+
+
+def record_points_activity(user_id, when=None, **deltas):
+    """
+    Add the given counter deltas (earned, redeemed, forms_completed,
+    achievements_uploaded) to the user's and the site's rollup for the day of `when`.
+    """
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return
+    day = timezone.localdate(when or timezone.now())
+    _increment_rollup(UserDailyPointsRollup, {'user_id': user_id, 'day': day}, deltas)
+    _increment_rollup(DailyPointsRollup, {'day': day}, deltas)
+
+
+def record_points_activity_bulk(per_user_deltas, when=None):
+    """
+    Record activity for many users on one day with set-based writes.
+    `per_user_deltas` maps user id to a dict of counter deltas; users sharing
+    identical deltas are incremented with a single UPDATE.
+    """
+    if not per_user_deltas:
+        return
+    day = timezone.localdate(when or timezone.now())
+    existing = set(
+        UserDailyPointsRollup.objects
+        .filter(user_id__in=per_user_deltas, day=day)
+        .values_list('user_id', flat=True)
+    )
+
+    users_by_deltas = {}
+    missing = []
+    totals = dict.fromkeys(ROLLUP_COUNTERS, 0)
+    for user_id, deltas in per_user_deltas.items():
+        for name, value in deltas.items():
+            totals[name] += value
+        if user_id in existing:
+            users_by_deltas.setdefault(tuple(sorted(deltas.items())), []).append(user_id)
+        else:
+            missing.append(user_id)
+
+    for deltas, user_ids in users_by_deltas.items():
+        UserDailyPointsRollup.objects.filter(user_id__in=user_ids, day=day).update(
+            **{name: F(name) + value for name, value in deltas}
+        )
+    if missing:
+        try:
+            with transaction.atomic():
+                UserDailyPointsRollup.objects.bulk_create([
+                    UserDailyPointsRollup(user_id=user_id, day=day, **per_user_deltas[user_id])
+                    for user_id in missing
+                ])
+        except IntegrityError:
+            # A concurrent writer created some of the rows; increment one by one.
+            for user_id in missing:
+                _increment_rollup(UserDailyPointsRollup, {'user_id': user_id, 'day': day}, per_user_deltas[user_id])
+
+    totals = {name: value for name, value in totals.items() if value}
+    if totals:
+        _increment_rollup(DailyPointsRollup, {'day': day}, totals)
+
+
+# --------------------- Cold Archive ---------------------
+
+class ArchivedFormSubmission(models.Model):
+    """Settled FormSubmission moved out of the hot table by archive_settled_records."""
+    original_id = models.BigIntegerField(unique=True)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='archived_form_submissions')
+    form_title = models.CharField(max_length=255)
+    points_earned = models.IntegerField()
+    submitted_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.email} - {self.form_title} - Archived"
+
+
+class ArchivedRewardRedemption(models.Model):
+    """Settled RewardRedemption moved out of the hot table by archive_settled_records."""
+    original_id = models.BigIntegerField(unique=True)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='archived_reward_redemptions')
+    reward_name = models.CharField(max_length=255)
+    reward_points = models.IntegerField()
+    requested_at = models.DateTimeField()
+    approved_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.email} - {self.reward_name} - Archived"
+
+
+# --------------------- Idempotency Keys ---------------------
+
+class IdempotencyKey(models.Model):
+    """
+    First response to a mutating request sent with an Idempotency-Key header.
+    A row with no status_code marks a request that is still in flight.
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_user_idempotency_key'),
+        ]
+
+    def __str__(self):
+        return f"Idempotency key {self.key} for {self.user_id}"
+
+
+# --------------------- Background Jobs ---------------------
+
+class Job(models.Model):
+    """
+    A unit of background work claimed and run by the run_job_worker command.
+    `task` names a function registered with auth_api.jobs.task; `payload` holds its keyword arguments.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    queue = models.CharField(max_length=64, default='default')
+    task = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Serves the worker's claim query: due pending jobs of one queue, oldest first.
+            models.Index(fields=['status', 'queue', 'run_at'], name='job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk} {self.task} ({self.status})"
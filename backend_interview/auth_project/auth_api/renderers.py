@@ -0,0 +1,49 @@
+"""
+Response renderers for the API.
+
+FastJSONRenderer uses orjson when it is installed and falls back to DRF's
+JSONRenderer otherwise. MessagePackRenderer gives the Flutter client a compact
+binary alternative via `Accept: application/msgpack`; it needs the optional
+msgpack package and is only enabled in settings when that is importable.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Non-native types (datetimes, Decimals, lazy strings, querysets...) are converted
+# exactly as DRF's JSONRenderer would, so every renderer emits the same values.
+_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by orjson; indented renders defer to DRF."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        return orjson.dumps(
+            data, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True, datetime=False)
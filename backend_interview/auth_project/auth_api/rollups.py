@@ -0,0 +1,146 @@
+"""
+Backfill and reporting helpers for the daily points rollup tables.
+
+The rollups are maintained incrementally by record_points_activity(); the
+helpers here rebuild them from the event tables and their archives (used once after deploying the
+rollups, or to repair drift) and read them back as per-day or per-month history.
+"""
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+
+from .models import (
+    ROLLUP_COUNTERS,
+    AchievementImage,
+    ArchivedFormSubmission,
+    ArchivedRewardRedemption,
+    CustomUser,
+    DailyPointsRollup,
+    FormSubmission,
+    RewardRedemption,
+    UserDailyPointsRollup,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKFILL_CHUNK_SIZE = 500
+
+
+def user_id_chunks(chunk_size=DEFAULT_BACKFILL_CHUNK_SIZE):
+    """Yield inclusive (first_id, last_id) ranges covering all users, chunk_size users each."""
+    ids = CustomUser.objects.order_by('id').values_list('id', flat=True)
+    last_id = 0
+    while True:
+        chunk = list(ids.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk[0], chunk[-1]
+        last_id = chunk[-1]
+
+
+def _event_sources(first_id, last_id):
+    # Archived rows were settled when they were moved, so they count like their hot counterparts.
+    user_range = {'user_id__gte': first_id, 'user_id__lte': last_id}
+    return [
+        (
+            FormSubmission.objects.filter(submitted=True, submitted_at__isnull=False, **user_range)
+            .annotate(day=TruncDate('submitted_at'))
+            .values('user_id', 'day')
+            .annotate(earned=Sum('points_earned'), forms_completed=Count('id')),
+            ('earned', 'forms_completed'),
+        ),
+        (
+            RewardRedemption.objects.filter(points_deducted=True, approved_at__isnull=False, **user_range)
+            .annotate(day=TruncDate('approved_at'))
+            .values('user_id', 'day')
+            .annotate(redeemed=Sum('reward_points')),
+            ('redeemed',),
+        ),
+        (
+            ArchivedFormSubmission.objects.filter(submitted_at__isnull=False, **user_range)
+            .annotate(day=TruncDate('submitted_at'))
+            .values('user_id', 'day')
+            .annotate(earned=Sum('points_earned'), forms_completed=Count('id')),
+            ('earned', 'forms_completed'),
+        ),
+        (
+            ArchivedRewardRedemption.objects.filter(approved_at__isnull=False, **user_range)
+            .annotate(day=TruncDate('approved_at'))
+            .values('user_id', 'day')
+            .annotate(redeemed=Sum('reward_points')),
+            ('redeemed',),
+        ),
+        (
+            AchievementImage.objects.filter(**user_range)
+            .annotate(day=TruncDate('uploaded_at'))
+            .values('user_id', 'day')
+            .annotate(achievements_uploaded=Count('id')),
+            ('achievements_uploaded',),
+        ),
+    ]
+
+
+def backfill_user_chunk(first_id, last_id):
+    """
+    Rebuild the per-user rollups for users with ids in [first_id, last_id]
+    from the event tables, replacing whatever rows were there. Returns the
+    number of rollup rows written.
+    """
+    totals = defaultdict(lambda: dict.fromkeys(ROLLUP_COUNTERS, 0))
+    for queryset, counters in _event_sources(first_id, last_id):
+        for row in queryset.order_by():
+            entry = totals[(row['user_id'], row['day'])]
+            for counter in counters:
+                entry[counter] += row[counter] or 0
+
+    rows = [
+        UserDailyPointsRollup(user_id=user_id, day=day, **counters)
+        for (user_id, day), counters in totals.items()
+    ]
+    with transaction.atomic():
+        UserDailyPointsRollup.objects.filter(user_id__gte=first_id, user_id__lte=last_id).delete()
+        UserDailyPointsRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def rebuild_daily_totals():
+    """Recompute the site-wide daily rollups from the per-user rollups."""
+    sums = {counter: Sum(counter) for counter in ROLLUP_COUNTERS}
+    rows = [
+        DailyPointsRollup(day=row['day'], **{counter: row[counter] or 0 for counter in ROLLUP_COUNTERS})
+        for row in UserDailyPointsRollup.objects.values('day').annotate(**sums).order_by('day')
+    ]
+    with transaction.atomic():
+        DailyPointsRollup.objects.all().delete()
+        DailyPointsRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def points_history(queryset, period='day', start=None, end=None):
+    """
+    Read rollup rows as a list of per-day or per-month dicts, oldest first.
+    `queryset` is a UserDailyPointsRollup or DailyPointsRollup queryset.
+    """
+    if start is not None:
+        queryset = queryset.filter(day__gte=start)
+    if end is not None:
+        queryset = queryset.filter(day__lte=end)
+
+    if period == 'month':
+        sums = {counter: Sum(counter) for counter in ROLLUP_COUNTERS}
+        rows = (
+            queryset.annotate(period=TruncMonth('day'))
+            .values('period')
+            .annotate(**sums)
+            .order_by('period')
+        )
+        return [
+            {'month': row['period'].strftime('%Y-%m'), **{c: row[c] for c in ROLLUP_COUNTERS}}
+            for row in rows
+        ]
+
+    rows = queryset.order_by('day').values('day', *ROLLUP_COUNTERS)
+    return [{**row, 'day': row['day'].isoformat()} for row in rows]
@@ -0,0 +1,50 @@
+"""
+Background job tasks. Imported from AuthApiConfig.ready() so every web and
+worker process has the same task registry.
+"""
+import logging
+import time
+
+from django.core.files.storage import default_storage, storages
+from django.db.models import Q
+
+from .jobs import task
+from .models import AchievementImage
+
+logger = logging.getLogger(__name__)
+
+
+def staging_storage():
+    """Storage holding uploads until a worker moves them to the default (S3) storage."""
+    return storages['job_staging']
+
+
+@task('upload_achievement_image', queue='uploads')
+def upload_achievement_image(user_id, staged_name, target_name):
+    """
+    Move a staged upload to the default storage and record it. Safe to retry: an
+    image already recorded for target_name is not uploaded or recorded again.
+    """
+    staging = staging_storage()
+    # Signed URLs differ per call, so match on the URL without its query string.
+    base_url = default_storage.url(target_name).split('?')[0]
+    image = AchievementImage.objects.filter(
+        Q(image_url=base_url) | Q(image_url__startswith=f'{base_url}?'), user_id=user_id
+    ).first()
+    if image is None:
+        with staging.open(staged_name, 'rb') as staged:
+            s3_path = default_storage.save(target_name, staged)
+        image = AchievementImage.objects.create(user_id=user_id, image_url=default_storage.url(s3_path))
+        logger.info(f"Achievement image uploaded for user {user_id}: {image.image_url}")
+    else:
+        logger.info(f"Achievement image {target_name} for user {user_id} was already recorded.")
+    staging.delete(staged_name)
+    return {'url': image.image_url}
+
+
+@task('noop', queue='default', max_attempts=1)
+def noop(sleep_ms=0):
+    """Does nothing (optionally sleeping); used to benchmark queue throughput."""
+    if sleep_ms:
+        time.sleep(sleep_ms / 1000)
+    return None
@@ -1,3 +1,835 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.admin import site as admin_site
+from django.contrib.auth.hashers import MD5PasswordHasher
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import QuerySet
+from django.db.models.functions import Lower
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from .archive import SUBMITTED_AT_MIGRATION, archive_settled, reject_stale_redemptions
+from .catalog import expire_catalog_version, get_reward_catalog
+from .exports import iter_export
+from .form_ingest import MAX_BATCH_SIZE, ingest_form_responses
+from .idempotency import idempotent
+from .jobs import claim_jobs, enqueue, execute_job, requeue_stale_jobs, task
+from .models import (
+    CustomUser,
+    CustomToken,
+    FormSubmission,
+    AchievementImage,
+    RewardRedemption,
+    Reward,
+    ArchivedFormSubmission,
+    ArchivedRewardRedemption,
+    IdempotencyKey,
+    Job,
+    DailyPointsRollup,
+    UserDailyPointsRollup,
+    _increment_rollup,
+    record_points_activity_bulk,
+)
+from .renderers import FastJSONRenderer, msgpack
+from .rollups import backfill_user_chunk
+from .tasks import staging_storage, upload_achievement_image
+
+
+class AdminChangelistQueryCountTests(TestCase):
+    """Changelist pages must run the same number of queries however many rows they show."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = CustomUser.objects.create_superuser('admin@example.com', 'password')
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def _create_rows(self, count):
+        for i in range(count):
+            user = CustomUser.objects.create_user(f'user{CustomUser.objects.count()}@example.com')
+            CustomToken.objects.create(user=user, token=f'token-{user.pk}', expires_at=timezone.now() + timedelta(days=i - 2))
+            FormSubmission.objects.create(user=user, form_title=f'Form {i}', submitted=bool(i % 2))
+            AchievementImage.objects.create(user=user, image_url=f'https://example.com/{user.pk}.jpg')
+            RewardRedemption.objects.create(user=user, reward_name=f'Reward {i}', reward_points=10)
+
+    def _changelist_queries(self, model):
+        url = reverse(f'admin:auth_api_{model._meta.model_name}_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_query_count_is_constant(self):
+        models = [CustomUser, CustomToken, FormSubmission, AchievementImage, RewardRedemption]
+        self._create_rows(2)
+        baseline = {model: self._changelist_queries(model) for model in models}
+        self._create_rows(20)
+        for model in models:
+            with self.subTest(model=model.__name__):
+                self.assertEqual(self._changelist_queries(model), baseline[model])
+
+
+class ApproveRewardRedemptionsActionTests(TestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_superuser('admin@example.com', 'password')
+        self.client.force_login(self.admin_user)
+
+    def _approve(self, redemption):
+        token, _ = Token.objects.get_or_create(user=self.admin_user)
+        return self.client.post(reverse('approve-reward'), {'redemption_request_id': redemption.pk},
+                                HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_bulk_approval_deducts_points_until_balance_runs_out(self):
+        user = CustomUser.objects.create_user('user@example.com', 'password', points=50)
+        bottle = Reward.objects.create(name='Test Bottle', points_cost=30, stock=4)
+        first = RewardRedemption.objects.create(user=user, reward_name='Cap', reward_points=30)
+        second = RewardRedemption.objects.create(user=user, reward=bottle, reward_name='Bottle', reward_points=30)
+
+        response = self.client.post(reverse('admin:auth_api_rewardredemption_changelist'), {
+            'action': 'approve_reward_redemptions',
+            '_selected_action': [first.pk, second.pk],
+        })
+
+        self.assertEqual(response.status_code, 302)
+        user.refresh_from_db()
+        first.refresh_from_db()
+        self.assertEqual(user.points, 20)
+        self.assertTrue(first.approved and first.points_deducted)
+        self.assertIsNotNone(first.approved_at)
+        # The uncovered request stays pending and keeps its reserved unit.
+        second.refresh_from_db()
+        self.assertEqual(second.status, 'Pending')
+        bottle.refresh_from_db()
+        self.assertEqual(bottle.stock, 4)
+
+    def test_reject_action_keeps_the_request_and_releases_stock(self):
+        user = CustomUser.objects.create_user('user@example.com', 'password', points=50)
+        bottle = Reward.objects.create(name='Test Bottle', points_cost=30, stock=4)
+        redemption = RewardRedemption.objects.create(user=user, reward=bottle, reward_name='Bottle', reward_points=30)
+
+        for _ in range(2):
+            self.client.post(reverse('admin:auth_api_rewardredemption_changelist'), {
+                'action': 'reject_selected_reward_redemptions',
+                '_selected_action': [redemption.pk],
+            })
+
+        redemption.refresh_from_db()
+        self.assertEqual(redemption.status, 'Rejected')
+        self.assertIsNotNone(redemption.rejected_at)
+        bottle.refresh_from_db()
+        # Rejecting twice releases the unit once.
+        self.assertEqual(bottle.stock, 5)
+
+        # A rejected request can no longer be approved.
+        self.assertEqual(self._approve(redemption).status_code, 404)
+
+    def test_approve_endpoint_leaves_uncovered_request_pending(self):
+        user = CustomUser.objects.create_user('user@example.com', 'password', points=10)
+        bottle = Reward.objects.create(name='Test Bottle', points_cost=30, stock=4)
+        redemption = RewardRedemption.objects.create(user=user, reward=bottle, reward_name='Bottle', reward_points=30)
+
+        self.assertEqual(self._approve(redemption).status_code, 400)
+        redemption.refresh_from_db()
+        self.assertEqual(redemption.status, 'Pending')
+        bottle.refresh_from_db()
+        self.assertEqual(bottle.stock, 4)
+
+
+class RedeemRewardTests(TestCase):
+    def setUp(self):
+        self.reward = Reward.objects.create(name='Test Ticket', points_cost=20, stock=3)
+        expire_catalog_version()
+
+    def _redeem(self, user):
+        token, _ = Token.objects.get_or_create(user=user)
+        return self.client.post(reverse('redeem-reward'), {'reward_id': self.reward.pk},
+                                HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_redemption_needs_points_before_reserving_stock(self):
+        user = CustomUser.objects.create_user('broke@example.com', 'password', points=0)
+
+        self.assertEqual(self._redeem(user).status_code, 400)
+        self.reward.refresh_from_db()
+        self.assertEqual(self.reward.stock, 3)
+        self.assertFalse(RewardRedemption.objects.exists())
+
+    def test_pending_requests_count_against_points(self):
+        user = CustomUser.objects.create_user('user@example.com', 'password', points=50)
+
+        statuses = [self._redeem(user).status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [201, 201, 400])
+        self.reward.refresh_from_db()
+        self.assertEqual(self.reward.stock, 1)
+
+    def test_price_comes_from_the_database_not_the_snapshot(self):
+        user = CustomUser.objects.create_user('user@example.com', 'password', points=100)
+        get_reward_catalog()
+        # Another process edits the price; this process's snapshot is still within its TTL.
+        Reward.objects.filter(pk=self.reward.pk).update(points_cost=35)
+
+        self.assertEqual(self._redeem(user).status_code, 201)
+        self.assertEqual(RewardRedemption.objects.get(user=user).reward_points, 35)
+
+    def test_catalog_version_follows_database_edits(self):
+        version = get_reward_catalog().version
+        self.reward.points_cost = 25
+        self.reward.save()
+        expire_catalog_version()
+
+        catalog = get_reward_catalog()
+        self.assertNotEqual(catalog.version, version)
+        self.assertEqual(catalog.by_id[self.reward.pk]['points_cost'], 25)
+
+
+class RewardStockTests(TestCase):
+    def setUp(self):
+        self.admin_user = CustomUser.objects.create_superuser('admin@example.com', 'password')
+        self.client.force_login(self.admin_user)
+        self.reward = Reward.objects.create(name='Test Ticket', points_cost=20, stock=3)
+
+    def test_admin_edit_keeps_reservations_made_while_the_form_was_open(self):
+        reward_admin = admin_site._registry[Reward]
+        request = RequestFactory().post('/')
+        request.user = self.admin_user
+        reward = reward_admin.get_object(request, str(self.reward.pk))
+        form = reward_admin.get_form(request, reward, change=True)(
+            {'name': reward.name, 'description': 'Limited drop', 'points_cost': 25, 'is_active': 'on'},
+            instance=reward,
+        )
+
+        self.assertTrue(Reward.reserve(self.reward.pk))
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        self.reward.refresh_from_db()
+        self.assertEqual((self.reward.stock, self.reward.points_cost), (2, 25))
+
+    def test_saving_a_loaded_reward_does_not_overwrite_stock(self):
+        reward = Reward.objects.get(pk=self.reward.pk)
+        Reward.reserve(self.reward.pk)
+        reward.description = 'Edited'
+        reward.save()
+        self.reward.refresh_from_db()
+        self.assertEqual(self.reward.stock, 2)
+
+        # An explicit stock change is still written.
+        reward.stock = 10
+        reward.save()
+        self.reward.refresh_from_db()
+        self.assertEqual(self.reward.stock, 10)
+
+    def test_restock_action_adds_to_live_stock(self):
+        Reward.reserve(self.reward.pk)
+        response = self.client.post(reverse('admin:auth_api_reward_changelist'), {
+            'action': 'restock_rewards',
+            'restock_count': '5',
+            '_selected_action': [self.reward.pk],
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.reward.refresh_from_db()
+        self.assertEqual(self.reward.stock, 7)
+
+
+class FormIngestTests(TestCase):
+    def test_respondent_emails_match_case_insensitively(self):
+        user = CustomUser.objects.create_user('Jane.Doe@example.com', 'unused')
+        rows = [
+            {'Email Address': 'jane.doe@EXAMPLE.com', 'form_title': 'Survey'},
+            {'Email Address': 'JANE.DOE@example.com', 'form_title': 'Survey'},
+        ]
+
+        stats = ingest_form_responses(rows, points=20)
+
+        user.refresh_from_db()
+        self.assertEqual((stats['matched'], stats['unmatched'], stats['created']), (1, 0, 1))
+        self.assertEqual(user.points, 20)
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', "EXPLAIN output is SQLite's")
+    def test_email_match_uses_the_lowercase_index(self):
+        plan = (
+            CustomUser.objects.annotate(email_lower=Lower('email'))
+            .filter(email_lower__in=['a@example.com', 'b@example.com'])
+            .explain()
+        )
+        self.assertIn('customuser_email_lower_idx', plan)
+        self.assertNotIn('SCAN auth_api_customuser', plan)
+
+    def test_endpoint_rejects_oversized_batches(self):
+        admin_user = CustomUser.objects.create_superuser('admin@example.com', 'password')
+        token = Token.objects.create(user=admin_user)
+        response = self.client.post(reverse('ingest-form-submissions'), {
+            'file': SimpleUploadedFile('responses.csv', b'Email Address,form_title\n'),
+            'batch_size': MAX_BATCH_SIZE + 1,
+        }, HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        self.assertEqual(response.status_code, 400)
+
+
+class PointsRollupTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('user@example.com', 'password', points=100)
+        self.token = Token.objects.create(user=self.user)
+        self.today = timezone.localdate()
+
+    def _rollup(self, user=None):
+        return UserDailyPointsRollup.objects.filter(user=user or self.user, day=self.today).values(
+            'earned', 'redeemed', 'forms_completed', 'achievements_uploaded'
+        ).first()
+
+    def _history(self, **params):
+        return self.client.get(reverse('points-history'), params, HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_events_update_user_and_site_rollups(self):
+        submission = FormSubmission.objects.create(user=self.user, form_title='Survey', points_earned=20)
+        submission.submitted = True
+        submission.save()
+        submission.save()
+        redemption = RewardRedemption.objects.create(user=self.user, reward_name='Cap', reward_points=30)
+        redemption.approved = True
+        redemption.save()
+        image = AchievementImage.objects.create(user=self.user, image_url='https://example.com/a.jpg')
+        image.save()
+
+        expected = {'earned': 20, 'redeemed': 30, 'forms_completed': 1, 'achievements_uploaded': 1}
+        self.assertEqual(self._rollup(), expected)
+        self.assertEqual(
+            DailyPointsRollup.objects.filter(day=self.today).values(*expected).get(), expected
+        )
+
+        # A rebuild from the event tables agrees with the incremental updates.
+        backfill_user_chunk(self.user.pk, self.user.pk)
+        self.assertEqual(self._rollup(), expected)
+
+    def test_manual_adjustment_is_not_rolled_up(self):
+        response = self.client.post(reverse('update-points'), {'points': 40},
+                                    HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(self._rollup())
+        self.assertFalse(DailyPointsRollup.objects.exists())
+
+    def test_increment_survives_a_concurrent_first_insert(self):
+        lookup = {'user_id': self.user.pk, 'day': self.today}
+        real_update = QuerySet.update
+        raced = []
+
+        def racing_update(queryset, **kwargs):
+            if not raced:
+                # Another writer inserts the day's row right after this writer found none.
+                raced.append(True)
+                UserDailyPointsRollup.objects.create(**lookup, earned=5)
+                return 0
+            return real_update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', racing_update):
+            _increment_rollup(UserDailyPointsRollup, lookup, {'earned': 3})
+
+        self.assertEqual(self._rollup()['earned'], 8)
+
+    def test_bulk_recording_updates_existing_and_creates_missing_rows(self):
+        other = CustomUser.objects.create_user('other@example.com', 'password')
+        UserDailyPointsRollup.objects.create(user=self.user, day=self.today, earned=10)
+
+        record_points_activity_bulk({
+            self.user.pk: {'earned': 20, 'forms_completed': 1},
+            other.pk: {'earned': 20, 'forms_completed': 1},
+        })
+
+        self.assertEqual(self._rollup(), {'earned': 30, 'redeemed': 0, 'forms_completed': 1, 'achievements_uploaded': 0})
+        self.assertEqual(self._rollup(other)['earned'], 20)
+        site = DailyPointsRollup.objects.get(day=self.today)
+        self.assertEqual((site.earned, site.forms_completed), (40, 2))
+
+    def test_history_by_day_month_and_site_wide(self):
+        other = CustomUser.objects.create_user('other@example.com', 'password')
+        for day, earned in [(date(2026, 1, 30), 10), (date(2026, 1, 31), 5), (date(2026, 2, 1), 7)]:
+            UserDailyPointsRollup.objects.create(user=self.user, day=day, earned=earned)
+            DailyPointsRollup.objects.create(day=day, earned=earned * 2)
+        UserDailyPointsRollup.objects.create(user=other, day=date(2026, 1, 30), earned=99)
+
+        days = self._history(start='2026-01-31', end='2026-02-01').json()['history']
+        self.assertEqual([(row['day'], row['earned']) for row in days], [('2026-01-31', 5), ('2026-02-01', 7)])
+
+        months = self._history(period='month').json()['history']
+        self.assertEqual([(row['month'], row['earned']) for row in months], [('2026-01', 15), ('2026-02', 7)])
+
+        self.assertEqual(self._history(scope='all').status_code, 403)
+        self.assertEqual(self._history(period='week').status_code, 400)
+        CustomUser.objects.filter(pk=self.user.pk).update(is_staff=True)
+        site = self._history(scope='all', period='month').json()['history']
+        self.assertEqual([(row['month'], row['earned']) for row in site], [('2026-01', 30), ('2026-02', 14)])
+
+
+class ArchiveSettledRecordsTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('user@example.com', 'password', points=1000)
+        self.old = timezone.now() - timedelta(days=400)
+
+    def _old_submission(self, title='Old form'):
+        return FormSubmission.objects.create(user=self.user, form_title=title, submitted=True, submitted_at=self.old)
+
+    def test_archive_moves_only_old_settled_rows(self):
+        old = self._old_submission()
+        recent = FormSubmission.objects.create(user=self.user, form_title='Recent form', submitted=True)
+        redemption = RewardRedemption.objects.create(user=self.user, reward_name='Cap', reward_points=10)
+        RewardRedemption.objects.filter(pk=redemption.pk).update(
+            approved=True, points_deducted=True, approved_at=self.old
+        )
+        pending = RewardRedemption.objects.create(user=self.user, reward_name='Bottle', reward_points=10)
+
+        self.assertEqual(archive_settled('submissions'), 1)
+        self.assertEqual(archive_settled('redemptions'), 1)
+
+        self.assertEqual(list(FormSubmission.objects.values_list('pk', flat=True)), [recent.pk])
+        self.assertEqual(list(RewardRedemption.objects.values_list('pk', flat=True)), [pending.pk])
+        self.assertTrue(ArchivedFormSubmission.objects.filter(original_id=old.pk, form_title='Old form').exists())
+        self.assertTrue(ArchivedRewardRedemption.objects.filter(original_id=redemption.pk).exists())
+        # Already archived rows are not moved again.
+        self.assertEqual(archive_settled('submissions'), 0)
+
+    def test_untimestamped_submissions_archive_once_the_column_is_old(self):
+        legacy = FormSubmission.objects.create(user=self.user, form_title='Legacy form', submitted=True)
+        FormSubmission.objects.filter(pk=legacy.pk).update(submitted_at=None)
+
+        # The column was only just added, so the row may be recent.
+        self.assertEqual(archive_settled('submissions'), 0)
+
+        app, name = SUBMITTED_AT_MIGRATION
+        MigrationRecorder.Migration.objects.filter(app=app, name=name).update(applied=self.old)
+        self.assertEqual(archive_settled('submissions'), 1)
+        self.assertTrue(ArchivedFormSubmission.objects.filter(original_id=legacy.pk, submitted_at=None).exists())
+
+    def test_stale_pending_redemptions_are_rejected_not_deleted(self):
+        bottle = Reward.objects.create(name='Test Bottle', points_cost=10, stock=0)
+        stale = RewardRedemption.objects.create(user=self.user, reward=bottle, reward_name='Bottle', reward_points=10)
+        fresh = RewardRedemption.objects.create(user=self.user, reward=bottle, reward_name='Bottle', reward_points=10)
+        RewardRedemption.objects.filter(pk=stale.pk).update(requested_at=self.old)
+
+        self.assertEqual(reject_stale_redemptions(), 1)
+        self.assertEqual(reject_stale_redemptions(), 0)
+
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual((stale.status, fresh.status), ('Rejected', 'Pending'))
+        bottle.refresh_from_db()
+        self.assertEqual(bottle.stock, 1)
+
+    def test_archived_form_is_not_credited_again(self):
+        self._old_submission()
+        archive_settled('submissions')
+        token = Token.objects.create(user=self.user)
+        points = CustomUser.objects.get(pk=self.user.pk).points
+
+        response = self.client.post(reverse('mark-form-completed'), {'form_title': 'Old form'},
+                                    HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(CustomUser.objects.get(pk=self.user.pk).points, points)
+        self.assertFalse(FormSubmission.objects.filter(form_title='Old form').exists())
+
+    def test_backfill_counts_archived_rows(self):
+        self._old_submission()
+        archive_settled('submissions')
+
+        backfill_user_chunk(self.user.pk, self.user.pk)
+
+        rollup = UserDailyPointsRollup.objects.get(user=self.user)
+        self.assertEqual(rollup.day, timezone.localdate(self.old))
+        self.assertEqual((rollup.earned, rollup.forms_completed), (20, 1))
+
+    def test_export_includes_archived_rows_on_request(self):
+        old = self._old_submission()
+        archive_settled('submissions')
+        recent = FormSubmission.objects.create(user=self.user, form_title='Recent form', submitted=True)
+
+        def exported(**options):
+            return [json.loads(line) for line in b''.join(iter_export('submissions', 'ndjson', **options)).splitlines()]
+
+        self.assertEqual([row['id'] for row in exported()], [recent.pk])
+        rows = exported(include_archived=True)
+        self.assertEqual([(row['id'], row['archived']) for row in rows], [(recent.pk, False), (old.pk, True)])
+        self.assertTrue(rows[1]['submitted'])
+        self.assertEqual(rows[1]['user__email'], 'user@example.com')
+
+
+class ExportFormatTests(TestCase):
+    def test_ndjson_and_csv_encode_timestamps_identically(self):
+        user = CustomUser.objects.create_user('user@example.com', 'password')
+        submitted_at = datetime(2026, 10, 19, 8, 30, 15, 592902, tzinfo=dt_timezone.utc)
+        FormSubmission.objects.create(user=user, form_title='Survey', submitted=True, submitted_at=submitted_at)
+
+        ndjson = json.loads(b''.join(iter_export('submissions', 'ndjson')))
+        header, row = b''.join(iter_export('submissions', 'csv')).decode().splitlines()
+        csv_row = dict(zip(header.split(','), row.split(',')))
+
+        self.assertEqual(ndjson['submitted_at'], submitted_at.isoformat())
+        self.assertEqual(csv_row['submitted_at'], ndjson['submitted_at'])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user('user@example.com', 'password', points=70)
+        self.token = Token.objects.create(user=self.user)
+
+    def _get(self, name, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name), params, HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        return response, [query['sql'] for query in queries]
+
+    def test_profile_points_is_one_query_reading_only_needed_columns(self):
+        response, queries = self._get('user-profile', fields='points')
+
+        self.assertEqual(response.json(), {'points': 70})
+        self.assertEqual(len(queries), 1)
+        user_columns = set(re.findall(r'"auth_api_customuser"\."(\w+)"', queries[0]))
+        self.assertEqual(user_columns, {'id', 'is_active', 'points'})
+
+    def test_unknown_or_empty_fields_are_rejected(self):
+        for fields in ('points,bogus', ' , '):
+            with self.subTest(fields=fields):
+                self.assertEqual(self._get('user-profile', fields=fields)[0].status_code, 400)
+                self.assertEqual(self._get('redemption-requests', fields=fields)[0].status_code, 400)
+
+    def test_redemption_list_joins_users_only_for_user_email(self):
+        RewardRedemption.objects.create(user=self.user, reward_name='Cap', reward_points=10)
+
+        def redemption_query(queries):
+            return next(sql for sql in queries if 'FROM "auth_api_rewardredemption"' in sql)
+
+        response, queries = self._get('redemption-requests', fields='id,status')
+        self.assertEqual(list(response.json()['requests'][0]), ['id', 'status'])
+        self.assertNotIn('JOIN', redemption_query(queries))
+
+        response, queries = self._get('redemption-requests', fields='id,user_email')
+        self.assertEqual(response.json()['requests'][0]['user_email'], 'user@example.com')
+        self.assertIn('JOIN', redemption_query(queries))
+
+    def test_inactive_user_is_rejected_by_projected_authentication(self):
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self._get('user-profile', fields='points')[0].status_code, 401)
+        self.assertEqual(self._get('user-profile')[0].status_code, 401)
+
+    def test_sign_in_returns_only_requested_fields(self):
+        response = self.client.post(f"{reverse('signin')}?fields=points",
+                                    {'email': 'user@example.com', 'password': 'password'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'token': self.token.key, 'points': 70})
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SignInRateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_forwarded_for_header_does_not_bypass_ip_limit(self):
+        attempts, _ = settings.SIGNIN_RATE_LIMITS['ip']
+        statuses = [
+            self.client.post(reverse('signin'), {'email': f'user{i}@example.com', 'password': 'wrong'},
+                             HTTP_X_FORWARDED_FOR=f'203.0.113.{i}').status_code
+            for i in range(attempts + 5)
+        ]
+        self.assertEqual(statuses[:attempts], [401] * attempts)
+        self.assertEqual(statuses[attempts:], [429] * 5)
+
+    def _sign_in(self, email, ip='198.51.100.1'):
+        return self.client.post(reverse('signin'), {'email': email, 'password': 'wrong'}, REMOTE_ADDR=ip)
+
+    def _hashing(self):
+        encode = mock.patch.object(MD5PasswordHasher, 'encode', autospec=True, side_effect=MD5PasswordHasher.encode)
+        verify = mock.patch.object(MD5PasswordHasher, 'verify', autospec=True, side_effect=MD5PasswordHasher.verify)
+        return encode, verify
+
+    def test_over_limit_attempt_skips_database_and_hashing(self):
+        CustomUser.objects.create_user('user@example.com', 'password')
+        attempts, _ = settings.SIGNIN_RATE_LIMITS['email']
+        for _ in range(attempts):
+            self.assertEqual(self._sign_in('user@example.com').status_code, 401)
+
+        encode, verify = self._hashing()
+        with encode as encode_mock, verify as verify_mock, CaptureQueriesContext(connection) as queries:
+            response = self._sign_in('user@example.com')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(queries), 0)
+        encode_mock.assert_not_called()
+        verify_mock.assert_not_called()
+
+    def test_email_limit_holds_across_ips(self):
+        attempts, _ = settings.SIGNIN_RATE_LIMITS['email']
+        statuses = [self._sign_in('Target@Example.com', ip=f'198.51.100.{i}').status_code for i in range(attempts + 1)]
+
+        self.assertEqual(statuses, [401] * attempts + [429])
+
+    def test_unknown_email_still_hashes(self):
+        encode, _ = self._hashing()
+        with encode as encode_mock:
+            response = self._sign_in('nobody@example.com')
+
+        self.assertEqual(response.status_code, 401)
+        encode_mock.assert_called_once()
+
+
+class ResponseEncodingTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('user@example.com', 'password', points=70)
+        self.token = Token.objects.create(user=self.user)
+
+    def _get(self, name, **headers):
+        return self.client.get(reverse(name), HTTP_AUTHORIZATION=f'Token {self.token.key}', **headers)
+
+    def test_fast_json_matches_drf_json(self):
+        data = {
+            'id': 7,
+            'name': gettext_lazy('Cap'),
+            'when': datetime(2026, 10, 19, 8, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'day': date(2026, 10, 19),
+            'price': Decimal('12.50'),
+            'ref': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'nested': [{'ok': True, 'none': None, 'ratio': 0.25, 'text': 'caf\u00e9'}],
+            3: 'non-string key',
+        }
+
+        fast = FastJSONRenderer().render(data)
+        drf = JSONRenderer().render(data)
+
+        self.assertEqual(json.loads(fast), json.loads(drf))
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_is_negotiated_and_encodes_like_json(self):
+        response = self._get('user-profile', HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        unpacked = msgpack.unpackb(response.content)
+        self.assertEqual(unpacked, self._get('user-profile').json())
+        # Datetimes are strings in DRF's format, not msgpack timestamps.
+        self.assertEqual(unpacked['date_joined'], json.loads(JSONRenderer().render(
+            {'date_joined': self.user.date_joined}))['date_joined'])
+
+    def test_only_large_api_payloads_are_compressed(self):
+        small = self._get('user-profile', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', small['Vary'])
+
+        RewardRedemption.objects.bulk_create(
+            RewardRedemption(user=self.user, reward_name=f'Reward {i}', reward_points=10) for i in range(50)
+        )
+        large = self._get('redemption-requests', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(large['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(large.content))['requests']), 50)
+
+    def test_admin_html_is_not_compressed(self):
+        admin_user = CustomUser.objects.create_superuser('admin@example.com', 'password')
+        self.client.force_login(admin_user)
+
+        response = self.client.get(reverse('admin:auth_api_reward_changelist'), HTTP_ACCEPT_ENCODING='gzip, br')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(response.content), settings.RESPONSE_COMPRESSION_MIN_BYTES)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class RewardCatalogETagTests(TestCase):
+    def setUp(self):
+        for i in range(20):
+            Reward.objects.create(name=f'Test reward {i}', description='A long description. ' * 5, points_cost=10 + i)
+        expire_catalog_version()
+        user = CustomUser.objects.create_user('user@example.com', 'password')
+        self.auth = f'Token {Token.objects.create(user=user).key}'
+
+    def test_compressed_catalog_etag_revalidates(self):
+        response = self.client.get(reverse('reward-catalog'), HTTP_AUTHORIZATION=self.auth, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/'))
+
+        response = self.client.get(reverse('reward-catalog'), HTTP_AUTHORIZATION=self.auth,
+                                   HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class CountingView(APIView):
+    """Echoes the request body and counts how often the handler really runs."""
+    calls = 0
+
+    @idempotent
+    def post(self, request):
+        CountingView.calls += 1
+        return Response({'calls': CountingView.calls, 'echo': request.data}, status=request.data.get('status', 201))
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        CountingView.calls = 0
+        self.user = CustomUser.objects.create_user('retry@example.com', 'unused')
+
+    def _post(self, data, key='key-1'):
+        request = APIRequestFactory().post('/counting/', data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+        force_authenticate(request, user=self.user)
+        return CountingView.as_view()(request)
+
+    def test_retry_replays_the_first_response(self):
+        first = self._post({'reward_id': 1})
+        retry = self._post({'reward_id': 1})
+
+        self.assertEqual((first.status_code, retry.status_code), (201, 201))
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(CountingView.calls, 1)
+        self.assertEqual(IdempotencyKey.objects.get(user=self.user, key='key-1').status_code, 201)
+
+    def test_key_reused_with_a_different_body_is_rejected(self):
+        self._post({'reward_id': 1})
+        response = self._post({'reward_id': 2})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(CountingView.calls, 1)
+
+    def test_server_error_releases_the_key(self):
+        self.assertEqual(self._post({'status': 503}).status_code, 503)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        self.assertEqual(self._post({'status': 503}).status_code, 503)
+        self.assertEqual(CountingView.calls, 2)
+
+    @override_settings(IDEMPOTENCY_IN_FLIGHT_LEASE_SECONDS=60)
+    def test_abandoned_claim_is_reclaimed_after_the_lease(self):
+        # A process that died mid-request leaves a claim with no response.
+        self._post({'reward_id': 1})
+        IdempotencyKey.objects.update(status_code=None, response_body=None,
+                                      created_at=timezone.now() - timedelta(minutes=2))
+
+        response = self._post({'reward_id': 1})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(CountingView.calls, 2)
+        self.assertEqual(IdempotencyKey.objects.get().status_code, 201)
+
+
+@task('test_flaky', queue='test')
+def flaky_task(fail_times):
+    # Fails while the running job is on one of its first `fail_times` attempts.
+    if Job.objects.filter(task='test_flaky', status=Job.RUNNING, attempts__lte=fail_times).exists():
+        raise RuntimeError('boom')
+    return {'ok': True}
+
+
+class JobQueueTests(TestCase):
+    def test_claims_are_exclusive_and_limited(self):
+        jobs = [enqueue('noop', queue='test') for _ in range(5)]
+
+        first = claim_jobs('test', 3, 'worker-a')
+        second = claim_jobs('test', 3, 'worker-b')
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(sorted(first + second), sorted(job.pk for job in jobs))
+        self.assertEqual(claim_jobs('test', 3, 'worker-c'), [])
+        self.assertEqual(Job.objects.filter(status=Job.RUNNING, attempts=1).count(), 5)
+
+    @override_settings(JOB_RETRY_BASE_SECONDS=10)
+    def test_failed_job_is_retried_with_backoff_then_failed(self):
+        job = enqueue('test_flaky', {'fail_times': 5}, max_attempts=2)
+
+        execute_job(claim_jobs('test', 1, 'worker')[0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.PENDING, 1))
+        self.assertIn('boom', job.last_error)
+        # Backed off by roughly the base delay (with jitter), so it is not due yet.
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=7))
+        self.assertEqual(claim_jobs('test', 1, 'worker'), [])
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        execute_job(claim_jobs('test', 1, 'worker')[0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_successful_retry_records_result(self):
+        job = enqueue('test_flaky', {'fail_times': 1}, max_attempts=3)
+        execute_job(claim_jobs('test', 1, 'worker')[0])
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        execute_job(claim_jobs('test', 1, 'worker')[0])
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result), (Job.SUCCEEDED, 2, {'ok': True}))
+
+    @override_settings(JOB_VISIBILITY_TIMEOUT_SECONDS=60)
+    def test_stale_jobs_are_requeued_until_out_of_attempts(self):
+        retry = enqueue('noop', queue='test', max_attempts=2)
+        last = enqueue('noop', queue='test', max_attempts=1)
+        claim_jobs('test', 2, 'crashed-worker')
+        Job.objects.update(locked_at=timezone.now() - timedelta(minutes=5))
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+
+        retry.refresh_from_db()
+        last.refresh_from_db()
+        self.assertEqual((retry.status, retry.locked_by), (Job.PENDING, ''))
+        self.assertEqual(last.status, Job.FAILED)
+
+    def test_upload_retry_does_not_record_the_image_twice(self):
+        user = CustomUser.objects.create_user('uploader@example.com', 'unused')
+        with tempfile.TemporaryDirectory() as media, tempfile.TemporaryDirectory() as staged:
+            # Django 5.0 drops the default storage's OPTIONS under override_settings, so
+            # its location comes from MEDIA_ROOT.
+            storages = {
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'job_staging': {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': staged}},
+            }
+            with override_settings(STORAGES=storages, MEDIA_ROOT=media):
+                staged_name = staging_storage().save('badge.png', ContentFile(b'png'))
+                target_name = f'user_{user.pk}/badge.png'
+
+                first = upload_achievement_image(user.pk, staged_name, target_name)
+                # A worker that dies after the upload leaves the job to be retried.
+                second = upload_achievement_image(user.pk, staged_name, target_name)
+
+                self.assertEqual(first, second)
+                self.assertEqual(AchievementImage.objects.filter(user=user).count(), 1)
+                self.assertFalse(staging_storage().exists(staged_name))
+                rollup = UserDailyPointsRollup.objects.get(user=user)
+                self.assertEqual(rollup.achievements_uploaded, 1)
+
+
+class SettingsProfileTests(SimpleTestCase):
+    def test_every_profile_passes_system_checks(self):
+        # Profiles are chosen when settings load, so each is checked in a fresh process.
+        for profile in settings.SETTINGS_PROFILES:
+            with self.subTest(profile=profile):
+                proc = subprocess.run(
+                    [sys.executable, 'manage.py', 'check'],
+                    cwd=settings.BASE_DIR, capture_output=True, text=True,
+                    env={**os.environ, 'DJANGO_SETTINGS_PROFILE': profile},
+                )
+                self.assertEqual(proc.returncode, 0, proc.stderr)
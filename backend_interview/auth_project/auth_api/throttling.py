@@ -0,0 +1,87 @@
+"""
+Sliding-window rate limiting for the sign-in endpoint.
+
+Each limiter keeps one counter per fixed window in the cache and estimates the
+rate over the trailing window as `previous * (1 - elapsed) + current`, which is
+O(1) in cache space per key (unlike DRF's default throttles, which store a
+timestamp per request). Throttles run in APIView.initial(), before the view
+touches the database or hashes a password.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Base throttle limiting attempts per identity over a sliding window.
+    Limits come from settings.SIGNIN_RATE_LIMITS[scope] as (attempts, window_seconds);
+    a missing or empty entry disables the throttle.
+    """
+    scope = None
+
+    def get_limit(self):
+        return getattr(settings, 'SIGNIN_RATE_LIMITS', {}).get(self.scope)
+
+    def get_identity(self, request):
+        raise NotImplementedError('.get_identity() must be overridden')
+
+    def allow_request(self, request, view):
+        limit = self.get_limit()
+        if not limit:
+            return True
+        identity = self.get_identity(request)
+        if identity is None:
+            return True
+
+        attempts, window = limit
+        cache = caches[getattr(settings, 'SIGNIN_RATE_LIMIT_CACHE', 'default')]
+        now = time.time()
+        window_index = int(now // window)
+        elapsed = (now % window) / window
+        # Hash the identity so emails never end up as raw cache keys.
+        key = f"ratelimit:{self.scope}:{hashlib.sha256(identity.encode()).hexdigest()}"
+        current_key = f"{key}:{window_index}"
+
+        # Rejected attempts still count, so a sustained burst stays blocked.
+        cache.add(current_key, 0, timeout=window * 2)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # The key expired between add() and incr().
+            cache.set(current_key, 1, timeout=window * 2)
+            current = 1
+        previous = cache.get(f"{key}:{window_index - 1}", 0)
+
+        if previous * (1 - elapsed) + current > attempts:
+            self.retry_after = window * (1 - elapsed)
+            return False
+        return True
+
+    def wait(self):
+        return getattr(self, 'retry_after', None)
+
+
+class SignInIPRateThrottle(SlidingWindowThrottle):
+    scope = 'ip'
+
+    def get_identity(self, request):
+        # Without NUM_PROXIES, DRF's get_ident() keys on the client-supplied
+        # X-Forwarded-For header, which would let every attempt pick a fresh identity.
+        if api_settings.NUM_PROXIES is None:
+            return request.META.get('REMOTE_ADDR')
+        return self.get_ident(request)
+
+
+class SignInEmailRateThrottle(SlidingWindowThrottle):
+    scope = 'email'
+
+    def get_identity(self, request):
+        email = request.data.get('email')
+        if not email or not isinstance(email, str):
+            return None
+        return email.strip().lower()
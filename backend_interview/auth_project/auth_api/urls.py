@@ -4,14 +4,19 @@ from .views import (
     SignInView, 
     UserProfileView, 
     UpdatePointsView, 
+    PointsHistoryView,
     GetCompletedFormsView, 
     MarkFormCompletedView,
     CountFormsSubmittedView,
+    IngestFormSubmissionsView,
     AchievementImageUploadView,  # Endpoint for uploading achievement images
+    JobStatusView,
     # New endpoints for reward redemption workflow
+    RewardCatalogView,
     RedeemRewardView,
     ApproveRewardView,
     RedemptionRequestsView,
+    DataExportView,
     SignOutView,
 )
 
@@ -20,13 +25,19 @@ urlpatterns = [
     path('api/signin/', SignInView.as_view(), name='signin'),
     path('api/user-profile/', UserProfileView.as_view(), name='user-profile'),
     path('api/update-points/', UpdatePointsView.as_view(), name='update-points'),
+    path('api/points_history/', PointsHistoryView.as_view(), name='points-history'),
     path('api/get_completed_forms/', GetCompletedFormsView.as_view(), name='get-completed-forms'),
     path('api/mark_form_completed/', MarkFormCompletedView.as_view(), name='mark-form-completed'),
+    path('api/ingest_form_submissions/', IngestFormSubmissionsView.as_view(), name='ingest-form-submissions'),
     path('api/count_forms_submitted/', CountFormsSubmittedView.as_view(), name='count-forms-submitted'),
     path('api/upload_achievement_image/', AchievementImageUploadView.as_view(), name='upload-achievement-image'),
+    path('api/jobs/<int:job_id>/', JobStatusView.as_view(), name='job-status'),
     # Reward redemption endpoints
+    path('api/rewards/', RewardCatalogView.as_view(), name='reward-catalog'),
     path('api/redeem_reward/', RedeemRewardView.as_view(), name='redeem-reward'),
     path('api/approve_reward/', ApproveRewardView.as_view(), name='approve-reward'),
     path('api/redemption_requests/', RedemptionRequestsView.as_view(), name='redemption-requests'),
+    # Staff data export endpoints
+    path('api/export/<str:dataset>/', DataExportView.as_view(), name='data-export'),
     path('api/signout/', SignOutView.as_view(), name='signout'),
 ]
@@ -7,14 +7,39 @@ from django.contrib.auth import authenticate
 from django.db import transaction, IntegrityError
 from django.core.exceptions import ValidationError
 from django.core.files.storage import default_storage
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from django.db.models import F
+from django.utils.http import parse_etags
+from django.db.models import F, Sum
+import codecs
+import csv
 import logging
 import uuid
 
 # Import RewardRedemption along with your existing models.
-from .models import CustomUser, FormSubmission, AchievementImage, RewardRedemption
+from .models import (
+    CustomUser,
+    FormSubmission,
+    AchievementImage,
+    RewardRedemption,
+    ArchivedFormSubmission,
+    ArchivedRewardRedemption,
+    Reward,
+    Job,
+    DailyPointsRollup,
+    UserDailyPointsRollup,
+)
 from .serializers import UserSerializer
+from .authentication import ProjectedTokenAuthentication
+from .fieldsets import Field, FieldSet
+from .catalog import get_reward_catalog
+from .idempotency import idempotent
+from .jobs import enqueue
+from .tasks import staging_storage
+from .throttling import SignInEmailRateThrottle, SignInIPRateThrottle
+from .exports import DATASETS, DEFAULT_CHUNK_SIZE, FORMATS, iter_export, parse_bound
+from .rollups import points_history
+from .form_ingest import DEFAULT_BATCH_SIZE, DEFAULT_FORM_POINTS, MAX_BATCH_SIZE, ingest_form_responses, iter_rows
 
 logger = logging.getLogger(__name__)
 
@@ -57,14 +82,42 @@ class SignUpView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# Sparse fieldsets (?fields=) for the read endpoints below.
+SIGNIN_FIELDS = FieldSet(
+    email=Field('email'),
+    points=Field('points'),
+)
+
+PROFILE_FIELDS = FieldSet(
+    email=Field('email'),
+    points=Field('points'),
+    date_joined=Field('date_joined'),
+)
+
+
 class SignInView(APIView):
+    """
+    Endpoint exchanging email and password for a token.
+    ?fields=email,points limits the user fields returned next to the token,
+    and the user lookup loads only those columns plus the password hash.
+    """
+    # Over-limit attempts are rejected with 429 before any DB lookup or password hashing.
+    throttle_classes = [SignInIPRateThrottle, SignInEmailRateThrottle]
+
     def post(self, request):
         email = request.data.get('email')
         password = request.data.get('password')
-        
+
+        try:
+            fields = SIGNIN_FIELDS.requested(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
-            user = CustomUser.objects.get(email=email)
+            user = CustomUser.objects.only('email', 'password', *SIGNIN_FIELDS.columns(fields)).get(email=email)
         except CustomUser.DoesNotExist:
+            # Hash anyway so unknown emails cost the same as wrong passwords.
+            CustomUser().set_password(password or '')
             logger.warning(f"Sign-in attempt with invalid email: {email}")
             return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
         
@@ -73,8 +126,7 @@ class SignInView(APIView):
             logger.info(f"User {user.email} authenticated successfully.")
             return Response({
                 'token': token.key,
-                'email': user.email,
-                'points': user.points
+                **SIGNIN_FIELDS.render_instance(user, fields),
             }, status=status.HTTP_200_OK)
         
         logger.warning(f"Invalid password attempt for user: {email}")
@@ -82,16 +134,69 @@ class SignInView(APIView):
 
 
 class UserProfileView(APIView):
+    """
+    Endpoint returning the authenticated user's profile.
+    With ?fields= the token lookup loads only the requested user columns, so
+    ?fields=points is a single primary-key query reading the points column.
+    """
+    authentication_classes = [ProjectedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    def get_user_columns(self, request):
+        try:
+            return PROFILE_FIELDS.columns(PROFILE_FIELDS.requested(request))
+        except ValueError:
+            # Load the full row; get() rejects the request.
+            return None
+
     def get(self, request):
+        try:
+            fields = PROFILE_FIELDS.requested(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         user = request.user
-        logger.info(f"Profile data retrieved for user: {user.email}")
-        return Response({
-            'email': user.email,
-            'points': user.points,
-            'date_joined': user.date_joined
-        }, status=status.HTTP_200_OK)
+        logger.info(f"Profile data retrieved for user {user.pk}")
+        return Response(PROFILE_FIELDS.render_instance(user, fields), status=status.HTTP_200_OK)
+
+
+class PointsHistoryView(APIView):
+    """
+    Endpoint returning the authenticated user's points history from the daily rollups.
+    Supports start/end dates and period=day|month; staff may pass scope=all for site-wide totals.
+    Reads are O(days) rather than O(events). Manual point adjustments are not included.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        params = request.query_params
+        period = params.get('period', 'day')
+        if period not in ('day', 'month'):
+            return Response({'error': 'Period must be day or month.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            start = parse_bound(params.get('start'))
+            end = parse_bound(params.get('end'), end=True)
+        except ValueError as e:
+            logger.error(f"Points history request rejected for {user.email}: {str(e)}")
+            return Response({'error': 'Invalid start or end date.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if params.get('scope') == 'all':
+            if not user.is_staff:
+                return Response({'error': 'Only staff can view site-wide history.'}, status=status.HTTP_403_FORBIDDEN)
+            queryset = DailyPointsRollup.objects.all()
+        else:
+            queryset = UserDailyPointsRollup.objects.filter(user=user)
+
+        history = points_history(
+            queryset,
+            period=period,
+            start=timezone.localdate(start) if start else None,
+            end=timezone.localdate(end) if end else None,
+        )
+        logger.info(f"Points history retrieved for user: {user.email}")
+        return Response({'period': period, 'history': history}, status=status.HTTP_200_OK)
 
 
 class UpdatePointsView(APIView):
@@ -110,6 +215,8 @@ class UpdatePointsView(APIView):
             if points < 0:
                 logger.error(f"Points update failed: Negative value provided by {user.email}")
                 return Response({'error': 'Points cannot be negative'}, status=status.HTTP_400_BAD_REQUEST)
+            # Manual adjustments are not rolled up: they have no event record for
+            # backfill_points_rollups to rebuild, and are not earnings or redemptions.
             user.points = points
             user.save()
             logger.info(f"User {user.email} points updated to {user.points}")
@@ -125,13 +232,16 @@ class GetCompletedFormsView(APIView):
     def get(self, request):
         user = request.user
         completed_forms = FormSubmission.objects.filter(user=user, submitted=True).values_list('form_title', flat=True)
+        # Archived submissions are still completed; the client relies on this list to prevent resubmission.
+        archived_forms = ArchivedFormSubmission.objects.filter(user=user).values_list('form_title', flat=True)
         logger.info(f"Completed forms retrieved for user: {user.email}")
-        return Response({'completed_forms': list(completed_forms)}, status=status.HTTP_200_OK)
+        return Response({'completed_forms': list(completed_forms) + list(archived_forms)}, status=status.HTTP_200_OK)
 
 
 class MarkFormCompletedView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         form_title = request.data.get('form_title')
         if not form_title:
@@ -140,6 +250,10 @@ class MarkFormCompletedView(APIView):
 
         user = request.user
 
+        if ArchivedFormSubmission.objects.filter(user=user, form_title=form_title).exists():
+            logger.info(f"Form '{form_title}' already submitted (archived) by user: {user.email}")
+            return Response({'message': 'This form has already been submitted.'}, status=status.HTTP_400_BAD_REQUEST)
+
         form_submission, created = FormSubmission.objects.get_or_create(user=user, form_title=form_title)
         if form_submission.submitted:
             logger.info(f"Form '{form_title}' already submitted by user: {user.email}")
@@ -163,6 +277,58 @@ class MarkFormCompletedView(APIView):
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class IngestFormSubmissionsView(APIView):
+    """
+    Staff endpoint for ingesting a Google Forms response export.
+    Accepts a multipart 'file' upload in CSV or NDJSON format; rows are streamed
+    from the upload and processed in batches, so large exports keep memory flat.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            logger.error("Form ingest failed: 'file' not found in request.")
+            return Response({'error': 'Export file is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        fmt = request.data.get('format')
+        if not fmt:
+            fmt = 'ndjson' if upload.name.endswith(('.ndjson', '.jsonl')) else 'csv'
+        if fmt not in ('csv', 'ndjson'):
+            return Response({'error': 'Format must be csv or ndjson.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            points = int(request.data.get('points', DEFAULT_FORM_POINTS))
+            batch_size = int(request.data.get('batch_size', DEFAULT_BATCH_SIZE))
+        except ValueError:
+            return Response({'error': 'Points and batch size must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        if points <= 0 or batch_size <= 0:
+            return Response({'error': 'Points and batch size must be greater than zero.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if batch_size > MAX_BATCH_SIZE:
+            return Response({'error': f'Batch size must be at most {MAX_BATCH_SIZE}.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            lines = codecs.iterdecode(upload, 'utf-8-sig')
+            stats = ingest_form_responses(
+                iter_rows(lines, fmt),
+                form_title=request.data.get('form_title') or None,
+                points=points,
+                batch_size=batch_size,
+            )
+        except (UnicodeDecodeError, csv.Error) as e:
+            logger.error(f"Form ingest failed for {upload.name}: {str(e)}")
+            return Response({'error': 'Could not parse the export file.'}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Unexpected error during form ingest for {upload.name}: {str(e)}")
+            return Response({'error': 'An error occurred while ingesting the export.'},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        logger.info(f"Form export {upload.name} ingested by {request.user.email}.")
+        return Response(stats, status=status.HTTP_200_OK)
+
+
 class CountFormsSubmittedView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -177,9 +343,12 @@ class AchievementImageUploadView(APIView):
     Endpoint for uploading achievement images.
     Users can upload images via the Flutter app which are then stored in AWS S3.
     The S3 URL is saved in the AchievementImage model, allowing multiple images per user.
+    With a `Prefer: respond-async` header the image is staged in the job_staging
+    storage, the S3 upload runs as a background job and the response is 202 with the job ID to poll.
     """
     permission_classes = [IsAuthenticated]
     
+    @idempotent
     def post(self, request):
         user = request.user
         if 'image' not in request.FILES:
@@ -188,6 +357,21 @@ class AchievementImageUploadView(APIView):
         
         image = request.FILES['image']
         unique_filename = f"user_{user.id}/{uuid.uuid4().hex}_{image.name}"
+
+        if 'respond-async' in request.headers.get('Prefer', ''):
+            try:
+                staged_name = staging_storage().save(unique_filename, image)
+                job = enqueue(
+                    'upload_achievement_image',
+                    {'user_id': user.id, 'staged_name': staged_name, 'target_name': unique_filename},
+                    user=user,
+                )
+            except Exception as e:
+                logger.error(f"Error staging achievement image for user {user.email}: {str(e)}")
+                return Response({'error': 'An error occurred while uploading the image.'},
+                                status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            logger.info(f"Achievement image for user {user.email} queued as job {job.id}.")
+            return Response({'job_id': job.id, 'status': job.status}, status=status.HTTP_202_ACCEPTED)
         
         try:
             s3_path = default_storage.save(unique_filename, image)
@@ -201,41 +385,122 @@ class AchievementImageUploadView(APIView):
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class JobStatusView(APIView):
+    """
+    Endpoint for polling a background job started by the authenticated user.
+    Returns the job status and, once it has succeeded, its result.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = Job.objects.filter(pk=job_id, user=request.user).values(
+            'id', 'task', 'status', 'attempts', 'result', 'created_at', 'finished_at'
+        ).first()
+        if job is None:
+            return Response({'error': 'Job not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job, status=status.HTTP_200_OK)
+
+
 # --------------------- Reward Redemption Endpoints ---------------------
 
+class RewardCatalogView(APIView):
+    """
+    Endpoint serving the active reward catalog from the in-memory snapshot.
+    Responses carry the catalog version as an ETag, so unchanged catalogs return 304.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        catalog = get_reward_catalog()
+        etag = f'"{catalog.version}"'
+        # Weak comparison: CompressionMiddleware sends the ETag back as W/"..." when it compresses the body.
+        client_etags = {tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))}
+        if etag in client_etags or '*' in client_etags:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(catalog.as_payload(), status=status.HTTP_200_OK, headers={'ETag': etag})
+
+
 class RedeemRewardView(APIView):
     """
     Endpoint for users to request a reward redemption.
-    Points are not deducted immediately; the request awaits admin approval.
+    The reward is looked up in the catalog by reward_id (or, for older clients,
+    reward_name); its cost always comes from the database, never the client.
+    Requests must be covered by the user's points less their other pending requests.
+    Limited stock is reserved immediately; points are not deducted until admin approval.
     """
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         user = request.user
+        reward_id = request.data.get('reward_id')
         reward_name = request.data.get('reward_name')
-        reward_points = request.data.get('reward_points')
 
-        if not reward_name or reward_points is None:
-            logger.error("Reward redemption request failed: reward_name or reward_points missing.")
-            return Response({'error': 'Reward name and reward points are required.'}, status=status.HTTP_400_BAD_REQUEST)
-        try:
-            reward_points = int(reward_points)
-        except ValueError:
-            logger.error("Reward redemption request failed: reward_points is not an integer.")
-            return Response({'error': 'Reward points must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        if reward_id is None and not reward_name:
+            logger.error("Reward redemption request failed: reward_id or reward_name missing.")
+            return Response({'error': 'Reward ID or reward name is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        catalog = get_reward_catalog()
+        if reward_id is not None:
+            try:
+                reward = catalog.by_id.get(int(reward_id))
+            except (TypeError, ValueError):
+                logger.error("Reward redemption request failed: reward_id is not an integer.")
+                return Response({'error': 'Reward ID must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            reward = catalog.by_name.get(reward_name)
+        if reward is None:
+            logger.error(f"Reward redemption request failed: unknown reward {reward_id or reward_name}.")
+            return Response({'error': 'Reward not found in the catalog.'}, status=status.HTTP_404_NOT_FOUND)
+
+        limited = reward['stock'] is not None
+        # Snapshot stock is only ever stale-high (restocks move the version), so zero is final.
+        if limited and reward['stock'] == 0:
+            logger.info(f"User {user.email} could not redeem {reward['name']}: out of stock.")
+            return Response({'error': 'This reward is out of stock.'}, status=status.HTTP_409_CONFLICT)
 
         try:
-            redemption = RewardRedemption.objects.create(
-                user=user,
-                reward_name=reward_name,
-                reward_points=reward_points,
-                approved=False
-            )
+            with transaction.atomic():
+                # Lock the user's row so concurrent requests can't all spend the same points. A no-op
+                # UPDATE rather than select_for_update(): on SQLite the transaction must start with a
+                # write to queue for the database lock instead of failing to upgrade a read lock.
+                CustomUser.objects.filter(pk=user.pk).update(points=F('points'))
+                balance = CustomUser.objects.values_list('points', flat=True).get(pk=user.pk)
+
+                # Snapshots may lag an edit by the version TTL, so the price comes from the database.
+                current = Reward.objects.filter(pk=reward['id'], is_active=True).values('name', 'points_cost').first()
+                if current is None:
+                    logger.error(f"Reward redemption request failed: reward {reward['id']} is no longer active.")
+                    return Response({'error': 'Reward not found in the catalog.'}, status=status.HTTP_404_NOT_FOUND)
+
+                # Pending requests already hold stock, so they count against the balance.
+                pending = RewardRedemption.objects.filter(user=user, approved=False, rejected_at__isnull=True).aggregate(
+                    total=Sum('reward_points'))['total'] or 0
+                if balance - pending < current['points_cost']:
+                    logger.info(f"User {user.email} could not redeem {current['name']}: insufficient points.")
+                    return Response({'error': 'Insufficient points for redemption.'},
+                                    status=status.HTTP_400_BAD_REQUEST)
+
+                # Reserve limited stock with a single conditional UPDATE; a failed insert below
+                # rolls the reservation back with the transaction.
+                if limited and not Reward.reserve(reward['id']):
+                    # The snapshot still shows stock; refresh every process's copy so it reads sold out.
+                    Reward.mark_sold_out(reward['id'])
+                    logger.info(f"User {user.email} could not redeem {current['name']}: out of stock.")
+                    return Response({'error': 'This reward is out of stock.'}, status=status.HTTP_409_CONFLICT)
+
+                redemption = RewardRedemption.objects.create(
+                    user=user,
+                    reward_id=reward['id'],
+                    reward_name=current['name'],
+                    reward_points=current['points_cost'],
+                    approved=False
+                )
         except Exception as e:
             logger.error(f"Error creating reward redemption request for user {user.email}: {str(e)}")
             return Response({'error': 'An error occurred while creating the redemption request.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        logger.info(f"User {user.email} requested redemption for {reward_name} costing {reward_points} points.")
+        logger.info(f"User {user.email} requested redemption for {redemption.reward_name} costing {redemption.reward_points} points.")
         return Response({
             'message': 'Reward redemption request submitted successfully. Await admin approval.',
             'redemption_request_id': redemption.id,
@@ -254,7 +519,9 @@ class ApproveRewardView(APIView):
         try:
             with transaction.atomic():
                 # Retrieve the redemption request and lock it
-                redemption = RewardRedemption.objects.select_for_update().get(id=redemption_request_id, approved=False)
+                redemption = RewardRedemption.objects.select_for_update().get(
+                    id=redemption_request_id, approved=False, rejected_at__isnull=True
+                )
 
                 # Log the redemption details
                 logger.info(f"Processing redemption request {redemption_request_id} for {redemption.reward_name}, {redemption.reward_points} points")
@@ -276,8 +543,9 @@ class ApproveRewardView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         except ValidationError as e:
-            logger.error(f"Validation error when approving redemption: {str(e)}")
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            # The request stays pending; rejecting it is a separate, explicit decision.
+            logger.error(f"Validation error when approving redemption {redemption_request_id}: {str(e)}")
+            return Response({'error': " ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error approving reward redemption: {str(e)}")
             return Response(
@@ -285,38 +553,126 @@ class ApproveRewardView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+REDEMPTION_FIELDS = FieldSet(
+    id=Field('id'),
+    user_email=Field('user__email'),
+    reward_name=Field('reward_name'),
+    reward_points=Field('reward_points'),
+    approved=Field('approved'),
+    points_deducted=Field('points_deducted'),
+    request_date=Field('requested_at', build=lambda row: row['requested_at'].isoformat()),
+    approval_date=Field('approved_at', build=lambda row: row['approved_at'].isoformat() if row['approved_at'] else None),
+    rejection_date=Field('rejected_at', build=lambda row: row['rejected_at'].isoformat() if row['rejected_at'] else None),
+    status=Field('approved', 'rejected_at', build=lambda row: (
+        'approved' if row['approved'] else 'rejected' if row['rejected_at'] else 'pending'
+    )),
+)
+
+# Archived redemptions are always settled, so their approval fields are constants.
+ARCHIVED_REDEMPTION_FIELDS = FieldSet(
+    id=Field('original_id'),
+    user_email=Field('user__email'),
+    reward_name=Field('reward_name'),
+    reward_points=Field('reward_points'),
+    approved=Field(build=lambda row: True),
+    points_deducted=Field(build=lambda row: True),
+    request_date=Field('requested_at', build=lambda row: row['requested_at'].isoformat()),
+    approval_date=Field('approved_at', build=lambda row: row['approved_at'].isoformat() if row['approved_at'] else None),
+    rejection_date=Field(build=lambda row: None),
+    status=Field(build=lambda row: 'approved'),
+)
+
+
 class RedemptionRequestsView(APIView):
     """
     Endpoint to fetch reward redemption requests.
     If the user is an admin, return all redemption requests.
     Otherwise, return only the requests for the authenticated user.
+    Archived (settled) redemptions are only included with ?include_archived=1.
+    ?fields= selects the keys returned per request; only their columns are read,
+    and the user table is joined only when user_email is requested.
     """
+    authentication_classes = [ProjectedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    def get_user_columns(self, request):
+        return ('email', 'is_staff', 'is_superuser')
+
     def get(self, request):
         user = request.user
+        try:
+            fields = REDEMPTION_FIELDS.requested(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         if user.is_staff or user.is_superuser:
             redemptions = RewardRedemption.objects.all()
         else:
             redemptions = RewardRedemption.objects.filter(user=user)
 
-        data = []
-        for redemption in redemptions:
-            data.append({
-                'id': redemption.id,
-                'user_email': redemption.user.email,
-                'reward_name': redemption.reward_name,
-                'reward_points': redemption.reward_points,
-                'approved': redemption.approved,
-                'points_deducted': redemption.points_deducted,
-                'request_date': redemption.requested_at.isoformat() if hasattr(redemption, 'requested_at') else '',
-                'approval_date': redemption.approved_at.isoformat() if redemption.approved_at else None,
-                'status': 'approved' if redemption.approved else 'pending'
-            })
+        data = [
+            REDEMPTION_FIELDS.render(row, fields)
+            for row in redemptions.values(*REDEMPTION_FIELDS.columns(fields))
+        ]
+
+        if request.query_params.get('include_archived') in ('1', 'true'):
+            if user.is_staff or user.is_superuser:
+                archived = ArchivedRewardRedemption.objects.all()
+            else:
+                archived = ArchivedRewardRedemption.objects.filter(user=user)
+            # values() with no columns would select them all; the pk is enough to count rows.
+            columns = ARCHIVED_REDEMPTION_FIELDS.columns(fields) or ['pk']
+            for row in archived.values(*columns):
+                data.append({**ARCHIVED_REDEMPTION_FIELDS.render(row, fields), 'archived': True})
 
         logger.info(f"Redemption requests fetched for user {user.email}")
         return Response({'requests': data}, status=status.HTTP_200_OK)
 
+# ------------------------- Data Export Endpoints -------------------------
+
+class DataExportView(APIView):
+    """
+    Staff endpoint streaming a points, submissions or redemptions export.
+    Supports start/end date filters, incremental exports via since_id, archived rows
+    via include_archived, ndjson/csv output and on-the-fly gzip; memory stays
+    constant regardless of row count.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request, dataset):
+        if dataset not in DATASETS:
+            return Response({'error': f'Unknown export dataset: {dataset}'}, status=status.HTTP_404_NOT_FOUND)
+
+        params = request.query_params
+        # 'format' is reserved by DRF content negotiation, so the file format is 'output'.
+        fmt = params.get('output', 'ndjson')
+        if fmt not in FORMATS:
+            return Response({'error': 'Output must be ndjson or csv.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            start = parse_bound(params.get('start'))
+            end = parse_bound(params.get('end'), end=True)
+            since_id = int(params['since_id']) if params.get('since_id') else None
+            chunk_size = int(params.get('chunk_size', DEFAULT_CHUNK_SIZE))
+        except ValueError as e:
+            logger.error(f"Export of {dataset} rejected: {str(e)}")
+            return Response({'error': 'Invalid start, end, since_id or chunk_size.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if chunk_size <= 0:
+            return Response({'error': 'Chunk size must be greater than zero.'}, status=status.HTTP_400_BAD_REQUEST)
+        compress = params.get('gzip') in ('1', 'true')
+        include_archived = params.get('include_archived') in ('1', 'true')
+
+        filename = f"{dataset}.{fmt}" + ('.gz' if compress else '')
+        response = StreamingHttpResponse(
+            iter_export(dataset, fmt, compress=compress, chunk_size=chunk_size, include_archived=include_archived,
+                        start=start, end=end, since_id=since_id),
+            content_type='application/gzip' if compress else FORMATS[fmt],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        logger.info(f"Streaming {dataset} export ({fmt}) for {request.user.email}.")
+        return response
+
+
 # ------------------- Local Storage and Auth Helper Endpoints -------------------
 
 class SignOutView(APIView):
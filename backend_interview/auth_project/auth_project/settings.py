@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 import os
+from importlib.util import find_spec
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -31,6 +34,22 @@ ALLOWED_HOSTS = [
     "10.64.62.222"
 ]
 
+# Settings profile, chosen per process with DJANGO_SETTINGS_PROFILE. 'full' (the
+# default) serves everything; 'api' serves only the mobile API, 'admin' only the
+# Django admin, and 'worker' (run_job_worker and other management commands) serves
+# no HTTP at all. Profiles skip the middleware, URL routes and admin discovery they
+# never use, which shortens cold starts. Every profile installs the same apps:
+# authtoken, admin and sessions own tables with foreign keys to users, and deletes
+# only cascade into models Django has loaded.
+SETTINGS_PROFILES = ('full', 'api', 'admin', 'worker')
+SETTINGS_PROFILE = os.environ.get('DJANGO_SETTINGS_PROFILE', 'full')
+if SETTINGS_PROFILE not in SETTINGS_PROFILES:
+    raise ImproperlyConfigured(
+        f"DJANGO_SETTINGS_PROFILE must be one of {', '.join(SETTINGS_PROFILES)}, not '{SETTINGS_PROFILE}'."
+    )
+SERVE_API = SETTINGS_PROFILE in ('full', 'api')
+SERVE_ADMIN = SETTINGS_PROFILE in ('full', 'admin')
+
 
 # Application definition
 
@@ -38,27 +57,37 @@ INSTALLED_APPS = [
     'rest_framework',
     'corsheaders',
     'auth_api',
-    'django.contrib.admin',
+    # SimpleAdminConfig keeps LogEntry but skips importing every admin.py at startup.
+    'django.contrib.admin' if SERVE_ADMIN else 'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework.authtoken',
-    'storages',
 ]
 
+# Middleware tagged with what it serves; the API authenticates with tokens, so it
+# does without sessions, CSRF and messages.
 MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'corsheaders.middleware.CorsMiddleware',
+    middleware for middleware, serves in [
+        ('django.middleware.security.SecurityMiddleware', None),
+        ('auth_api.middleware.CompressionMiddleware', None),
+        ('django.contrib.sessions.middleware.SessionMiddleware', 'admin'),
+        ('django.middleware.common.CommonMiddleware', None),
+        ('django.middleware.csrf.CsrfViewMiddleware', 'admin'),
+        ('django.contrib.auth.middleware.AuthenticationMiddleware', 'admin'),
+        ('django.contrib.messages.middleware.MessageMiddleware', 'admin'),
+        ('django.middleware.clickjacking.XFrameOptionsMiddleware', None),
+        ('corsheaders.middleware.CorsMiddleware', 'api'),
+    ]
+    if serves is None or (serves == 'admin' and SERVE_ADMIN) or (serves == 'api' and SERVE_API)
 ]
 
+# Without the admin site, the installed SimpleAdminConfig would still demand the
+# session, auth and messages middleware that only admin pages use.
+SILENCED_SYSTEM_CHECKS = [] if SERVE_ADMIN else ['admin.E408', 'admin.E409', 'admin.E410']
+
 ROOT_URLCONF = 'auth_project.urls'
 
 TEMPLATES = [
@@ -142,11 +171,72 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
     ],
+    # orjson-backed JSON by default; MessagePack (Accept: application/msgpack) when installed.
+    'DEFAULT_RENDERER_CLASSES': [
+        'auth_api.renderers.FastJSONRenderer',
+        *(['auth_api.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        # The browsable API pulls in forms and templates; only the full profile renders it.
+        *(['rest_framework.renderers.BrowsableAPIRenderer'] if SETTINGS_PROFILE == 'full' else []),
+    ],
     'TOKEN_MODEL': 'auth_api.CustomToken',
+    # Number of trusted reverse proxies in front of the app. Client IPs (used by the
+    # sign-in rate limit) are read from X-Forwarded-For only behind that many proxies.
+    'NUM_PROXIES': int(os.environ.get('DJANGO_NUM_PROXIES', 0)),
 }
 
 AUTH_USER_MODEL = 'auth_api.CustomUser'
 
+# Caches. Local memory is per process; point 'default' at a shared backend such as
+# 'django.core.cache.backends.redis.RedisCache' so limits hold across workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Sign-in rate limits as (attempts, window in seconds), enforced with a sliding
+# window per client IP and per email before any DB or password hashing work.
+SIGNIN_RATE_LIMITS = {
+    'ip': (20, 60),
+    'email': (5, 60),
+}
+SIGNIN_RATE_LIMIT_CACHE = 'default'
+
+# Responses at least this large are gzip/brotli compressed when the client accepts it.
+RESPONSE_COMPRESSION_MIN_BYTES = 1024
+
+# Background job queue (see the run_job_worker management command).
+JOB_QUEUE_CONCURRENCY = {
+    'default': 4,
+    'uploads': 2,
+}
+JOB_RETRY_BASE_SECONDS = 5
+JOB_RETRY_MAX_SECONDS = 60 * 60
+# Running jobs not finished within this long are assumed abandoned and requeued.
+JOB_VISIBILITY_TIMEOUT_SECONDS = 10 * 60
+# Uploads wait in the 'job_staging' storage (see STORAGES) until a worker moves them
+# to S3. By default that is this local directory, which only works while web and
+# worker processes share a host or mount it as a shared volume.
+JOB_STAGING_DIR = BASE_DIR / 'job_staging'
+
+# How long a stored Idempotency-Key response is replayed before the key can be reused.
+IDEMPOTENCY_KEY_TTL_SECONDS = 60 * 60 * 24
+# A key whose request has not finished after this long is treated as abandoned by a
+# crashed process and can be claimed by a retry. Keep it above the slowest request.
+IDEMPOTENCY_IN_FLIGHT_LEASE_SECONDS = 5 * 60
+
+# Each process re-reads the reward catalog version from the database at most this
+# often, so catalog edits reach every process within this many seconds.
+REWARD_CATALOG_VERSION_TTL_SECONDS = 5
+
+# Redemption requests still pending after this many days are rejected by
+# archive_settled_records, returning the stock they reserved.
+REDEMPTION_PENDING_DAYS = 30
+
+# Settled redemptions and submissions older than this many days are moved to the
+# archive tables by the archive_settled_records management command.
+ARCHIVE_AFTER_DAYS = 180
+
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',  # This is the standard backend for admin login
 ]
@@ -163,8 +253,24 @@ AWS_S3_OBJECT_PARAMETERS = {
 }
 AWS_QUERYSTRING_AUTH = True  # Use query parameter authentication for URLs
 
-# Tell Django to use S3 for file storage
-DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
+# Tell Django to use S3 for file storage. django.core.files.storage.default_storage
+# only builds the backend on first use, and the backend creates its boto3 session
+# and client lazily, so boto3 is never imported by processes that don't store files.
+STORAGES = {
+    'default': {
+        'BACKEND': 'storages.backends.s3boto3.S3Boto3Storage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+    # Staged uploads for background jobs; must be readable from every worker host.
+    # Workers on other hosts need a shared backend instead, e.g.
+    # {'BACKEND': 'storages.backends.s3boto3.S3Boto3Storage', 'OPTIONS': {'location': 'job-staging'}}.
+    'job_staging': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {'location': JOB_STAGING_DIR},
+    },
+}
 
 # Media files configuration
 MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/'
@@ -1,7 +1,14 @@
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
 
-urlpatterns = [
-    path('admin/', admin.site.urls),
-    path('', include('auth_api.urls')),
-]
\ No newline at end of file
+# Only route what the settings profile serves (see SETTINGS_PROFILE), so the api
+# profile never imports the admin and the admin profile never imports the API views.
+urlpatterns = []
+
+if settings.SERVE_ADMIN:
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
+
+if settings.SERVE_API:
+    urlpatterns.append(path('', include('auth_api.urls')))